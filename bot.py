@@ -3,6 +3,7 @@ from discord import app_commands
 from discord.ext import commands
 import config
 import sys
+from services import HttpClient, ScryfallError
 
 # Bot setup
 intents = discord.Intents.default()
@@ -19,6 +20,15 @@ bot = commands.Bot(
 # Command tree for slash commands
 tree = bot.tree
 
+# One shared HTTP connection pool for every cog (started in main)
+bot.http_client = HttpClient(
+    config.USER_AGENT,
+    limit=config.HTTP_POOL_SIZE,
+    limit_per_host=config.HTTP_POOL_PER_HOST,
+    total_timeout=config.HTTP_TIMEOUT,
+    connect_timeout=config.HTTP_CONNECT_TIMEOUT
+)
+
 
 @bot.event
 async def on_ready():
@@ -74,6 +84,20 @@ async def on_command_error(ctx, error):
             inline=False
         )
         await ctx.send(embed=embed)
+    elif isinstance(error, commands.CommandInvokeError) and isinstance(error.original, ScryfallError):
+        embed = discord.Embed(
+            title="⚠️ Scryfall Unavailable",
+            description="Scryfall isn't responding right now, so I couldn't look that up.",
+            color=config.COLOR_WARNING
+        )
+        embed.add_field(
+            name="💡 Hint",
+            value="Try again in a minute. Cards I've looked up before still work while Scryfall is down.",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+        print(f'Scryfall error: {error.original}', file=sys.stderr)
+        sys.stdout.flush()
     elif isinstance(error, commands.MemberNotFound):
         embed = discord.Embed(
             title="❌ Player Not Found",
@@ -183,12 +207,48 @@ async def help_command(ctx, category: str = None):
         )
         embed.add_field(
             name=f"{config.COMMAND_PREFIX} price <name>",
-            value="Get current market prices for a card.\n**Example:** `!mtg price Mana Crypt`",
+            value="Get current market prices for a card, or several separated by `;`.\n**Examples:**\n`!mtg price Mana Crypt`\n`!mtg price Sol Ring; Mana Crypt; Rhystic Study`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} pricehistory <name>",
+            value="Show a card's price trend and percent change over time.\n**Example:** `!mtg pricehistory Rhystic Study`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} watch <name> [percent]",
+            value="Get pinged when a card's price moves more than a percentage in a day. "
+                  "`unwatch` stops, `watchlist` lists your cards.\n**Example:** `!mtg watch The One Ring 15%`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} search <query>",
+            value="Search cards with Scryfall syntax (colors, identity, types, mana value, P/T, text). Use the buttons to page through results.\n**Examples:**\n`!mtg search c:ug t:instant cmc<=2`\n`!mtg search id<=wubrg t:legendary t:creature pow>=5`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} oracle <text>",
+            value="Find cards by rules text. Quote a phrase to require it exactly.\n**Examples:**\n`!mtg oracle whenever a creature dies, draw a card`\n`!mtg oracle \"can't be countered\" flash`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} rulings <name>",
+            value="Show official rulings for a card.\n**Example:** `!mtg rulings Blood Moon`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} similar <name>",
+            value="Find cards that do similar things.\n**Example:** `!mtg similar Blood Artist`",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{config.COMMAND_PREFIX} deck <decklist>",
+            value="Analyze a pasted or attached decklist: mana curve, color pips, color identity and price.\n**Example:** `!mtg deck` with a Moxfield or Archidekt .txt export attached",
             inline=False
         )
         embed.add_field(
             name=f"{config.COMMAND_PREFIX} random",
-            value="Get a random MTG card.\n**Example:** `!mtg random`",
+            value="Get a random MTG card, optionally matching search filters.\n**Example:** `!mtg random legendary creature c:g`",
             inline=False
         )
 
@@ -284,6 +344,29 @@ async def sync(ctx):
         sys.stdout.flush()
 
 
+@bot.command(name='httpstats')
+@commands.is_owner()
+async def http_stats(ctx):
+    """Show outbound HTTP latency per endpoint (Owner only)"""
+    stats = bot.http_client.stats()
+    if not stats:
+        await ctx.send('No outbound HTTP requests yet.')
+        return
+
+    embed = discord.Embed(title="Outbound HTTP Latency", color=config.COLOR_PRIMARY)
+    for endpoint in stats[:25]:
+        embed.add_field(
+            name=endpoint['endpoint'][:256],
+            value=(
+                f"{endpoint['count']} requests, {endpoint['errors']} errors\n"
+                f"avg {endpoint['avg_ms']:.0f} ms • p50 ≤{endpoint['p50_ms']:.0f} ms • "
+                f"p95 ≤{endpoint['p95_ms']:.0f} ms • max {endpoint['max_ms']:.0f} ms"
+            ),
+            inline=False
+        )
+    await ctx.send(embed=embed)
+
+
 # Slash Commands
 @tree.command(name="ping", description="Check bot latency")
 async def slash_ping(interaction: discord.Interaction):
@@ -315,17 +398,21 @@ async def main():
     print('Starting MTG Commander Bot...')
     sys.stdout.flush()
 
-    async with bot:
-        await load_extensions()
+    await bot.http_client.start()
+    try:
+        async with bot:
+            await load_extensions()
 
-        if not config.DISCORD_TOKEN:
-            print('Error: DISCORD_TOKEN not found in .env file')
-            print('Please copy .env.example to .env and add your bot token')
-            return
+            if not config.DISCORD_TOKEN:
+                print('Error: DISCORD_TOKEN not found in .env file')
+                print('Please copy .env.example to .env and add your bot token')
+                return
 
-        print('Connecting to Discord...')
-        sys.stdout.flush()
-        await bot.start(config.DISCORD_TOKEN)
+            print('Connecting to Discord...')
+            sys.stdout.flush()
+            await bot.start(config.DISCORD_TOKEN)
+    finally:
+        await bot.http_client.close()
 
 
 if __name__ == '__main__':
@@ -1,8 +1,34 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiohttp
+import asyncio
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+import re
+import time
 import config
+from models import Card
+from services import (
+    BloomFilter, CardCache, CardIndex, FuzzyMatcher, HttpCache, ImageCache, LRUCache, ManaSymbols, OracleIndex, PopularityTracker, PrefixIndex, PriceHistory,
+    BACKGROUND, INTERACTIVE, RequestScheduler, ScryfallError, SimilarityIndex, SingleFlight, Watchlist, normalize_name
+)
+from services.bulk_import import build_index
+from services.card_images import compose_faces, face_image_urls
+from services.card_index import card_names, download_bulk_data, fetch_bulk_info, iter_index_cards
+from services.card_search import CardTable, SearchError
+from services.decklist import CURVE_MAX, DeckAnalysis, parse_decklist
+from services.oracle_index import build_oracle_index
+from services.price_history import append_snapshot, price_snapshot, summarize
+from services.similar import build_similarity_index
+from services.symbols import load_symbology
+from views import LocalSearchPages, Paginator, ScryfallSearchPages
+
+# Multi-card lookups are separated by semicolons or newlines (card names can contain commas)
+CARD_LIST_SEPARATOR = re.compile(r'[;\n]')
+WATCH_THRESHOLD = re.compile(r'\s+(\d+(?:\.\d+)?)%$')
+CARD_MENTION = re.compile(r'\[\[([^\[\]\n]{1,%d})\]\]' % config.INLINE_CARD_NAME_MAX)
 
 
 class Cards(commands.Cog):
@@ -11,42 +37,533 @@ class Cards(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.session = None
+        self.scheduler = None
+        self.http_cache = HttpCache(
+            config.HTTP_CACHE_PATH,
+            config.HTTP_CACHE_MAX_BYTES,
+            config.HTTP_CACHE_FRESH_TTL,
+            config.HTTP_CACHE_STALE_TTL
+        )
+        self.cache = CardCache(
+            config.CARD_CACHE_SIZE,
+            config.CARD_CACHE_TTL,
+            max_bytes=config.CARD_CACHE_MAX_BYTES
+        )
+        self.price_cache = LRUCache(config.PRICE_CACHE_SIZE, config.PRICE_CACHE_TTL)
+        self.embed_cache = LRUCache(config.EMBED_CACHE_SIZE, config.CARD_CACHE_TTL)
+        self.index = CardIndex(config.CARD_INDEX_PATH)
+        self.oracle_index = OracleIndex(config.ORACLE_INDEX_PATH)
+        self.similar_index = SimilarityIndex(config.SIMILAR_INDEX_PATH)
+        self.matcher = FuzzyMatcher()
+        self.prefix_index = PrefixIndex()
+        self.card_table = CardTable()
+        self.inflight = SingleFlight()
+        self.known_names = None  # Bloom filter of every normalized card name in the index
+        self.negative_cache = LRUCache(config.NEGATIVE_CACHE_SIZE, config.NEGATIVE_CACHE_TTL)
+        self.bloom_rejections = 0
+        self.price_history = PriceHistory(config.PRICE_HISTORY_PATH)
+        self.watchlist = Watchlist(config.WATCHLIST_PATH)
+        self.rulings_cache = LRUCache(config.RULINGS_CACHE_SIZE, config.RULINGS_CACHE_TTL)  # {oracle id: rulings}
+        self.prefetches = set()  # Background rulings fetches, kept referenced until done
+        self.image_cache = ImageCache(config.IMAGE_CACHE_DIR, config.IMAGE_CACHE_MAX_BYTES)
+        self.symbols = ManaSymbols()
+        self.symbology = []
+        self.image_pool = ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS, thread_name_prefix='card-images')
+        self.popularity = PopularityTracker(config.POPULARITY_PATH, config.POPULARITY_TOP_SIZE)
 
     async def cog_load(self):
-        """Create aiohttp session when cog loads"""
-        self.session = aiohttp.ClientSession()
+        """Attach to the shared HTTP client, restore the card cache and open the card index when cog loads"""
+        self.session = self.bot.http_client.session
+        self.http_cache.open()
+        self.scheduler = RequestScheduler(
+            self.session,
+            rate=config.SCRYFALL_RATE_LIMIT,
+            burst=config.SCRYFALL_RATE_LIMIT,
+            max_retries=config.SCRYFALL_MAX_RETRIES,
+            cache=self.http_cache
+        )
+        restored = self.cache.load(config.CARD_CACHE_PATH)
+        if restored:
+            print(f'Restored {restored} cached cards')
+
+        if self.index.open():
+            print(f'Opened card index ({self.index.card_count} cards)')
+            await self.load_card_names()
+            await self.load_card_table()
+            self.oracle_index.open()
+            self.similar_index.open()
+        self.price_history.open()
+        self.watchlist.load()
+        self.image_cache.open()
+        self.popularity.load()
+        self.refresh_index.start()
+        self.warm_cache.start()
 
     async def cog_unload(self):
-        """Close aiohttp session when cog unloads"""
-        if self.session:
-            await self.session.close()
+        """Close local indexes and snapshot the card cache when cog unloads"""
+        self.refresh_index.cancel()
+        self.warm_cache.cancel()
+        self.index.close()
+        self.oracle_index.close()
+        self.price_history.close()
+        await self.http_cache.close()
+        self.image_pool.shutdown(wait=False, cancel_futures=True)
+
+        try:
+            self.cache.save(config.CARD_CACHE_PATH)
+            self.popularity.save()
+        except OSError as e:
+            print(f"Error saving card cache: {e}")
+
+    @tasks.loop(hours=config.CARD_INDEX_REFRESH_HOURS)
+    async def refresh_index(self):
+        """Rebuild the local card index when Scryfall publishes new bulk data"""
+        try:
+            if self.index.available and not (len(self.oracle_index) and len(self.similar_index)):
+                # Search indexes are missing (first run after an upgrade); build them from the current index
+                await self.build_search_indexes(config.CARD_INDEX_PATH)
+            if self.index.available and self.price_history.dates[-1:] != [self.price_date()]:
+                await self.record_prices()
+
+            info = await fetch_bulk_info(self.scheduler, config.SCRYFALL_API_BASE, config.CARD_INDEX_BULK_TYPE)
+            if not info or info.get('updated_at') == self.index.source_updated_at:
+                return
+
+            bulk_path = os.path.join(config.DATA_DIR, f'{config.CARD_INDEX_BULK_TYPE}.json')
+            os.makedirs(config.DATA_DIR, exist_ok=True)
+            if not await download_bulk_data(self.session, info['download_uri'], bulk_path):
+                return
+
+            new_path = f'{config.CARD_INDEX_PATH}.new'
+            count = await asyncio.to_thread(build_index, bulk_path, new_path, info.get('updated_at', ''))
+            self.index.swap(new_path)
+            os.remove(bulk_path)
+            await self.build_search_indexes(config.CARD_INDEX_PATH)
+            # Card data changed; drop anything rendered or cached from the old index
+            self.cache.clear()
+            self.embed_cache.clear()
+            await self.load_card_names()
+            await self.load_card_table()
+            await self.record_prices()
+            print(f'Card index refreshed ({count} cards)')
+        except Exception as e:
+            print(f"Error refreshing card index: {e}")
+
+    @refresh_index.before_loop
+    async def before_refresh_index(self):
+        # Price alerts sent by a refresh need channels, which only resolve once the bot is ready
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(minutes=config.POPULARITY_WARM_MINUTES)
+    async def warm_cache(self):
+        """Keep the most looked-up cards, their rulings and face images cached
+
+        Runs on spare Scryfall capacity: requests are sent at background
+        priority, a pass sends at most POPULARITY_WARM_MAX_REQUESTS, and it
+        stops early whenever a user request is waiting in the scheduler.
+        """
+        try:
+            if time.time() - self.popularity.decayed_at > config.POPULARITY_DECAY_DAYS * 24 * 60 * 60:
+                self.popularity.decay()
+
+            requests = 0
+            for key, name, _ in self.popularity.most_common():
+                if requests >= config.POPULARITY_WARM_MAX_REQUESTS or self.scheduler.queue_depth:
+                    break
+
+                card_data = self.cache.peek(name) or self.lookup_local(name)
+                if not card_data:
+                    if self.is_known_miss(key):
+                        continue
+                    requests += 1
+                    card_data = await self.inflight.do(
+                        ('named', key), lambda: self.fetch_card_named(name, priority=BACKGROUND)
+                    )
+                    if not card_data:
+                        continue
+                    self.cache.put(card_data, query=name)
+
+                if (card_data.get('oracle_id') or card_data['id']) not in self.rulings_cache:
+                    requests += 1
+                    await self.get_rulings(card_data, priority=BACKGROUND)
+                if face_image_urls(card_data) and card_data['id'] not in self.image_cache:
+                    requests += 1
+                    await self.face_composite(card_data)
+        except Exception as e:
+            print(f"Error warming card cache: {e}")
+
+        if self.popularity.dirty:
+            try:
+                await asyncio.to_thread(self.popularity.save)
+            except OSError as e:
+                print(f"Error saving card popularity: {e}")
+
+    async def build_search_indexes(self, db_path: str):
+        """Build the oracle text and similarity indexes from a card index file and swap them in"""
+        new_oracle_path = f'{config.ORACLE_INDEX_PATH}.new'
+        new_similar_path = f'{config.SIMILAR_INDEX_PATH}.new'
+        await asyncio.to_thread(build_oracle_index, iter_index_cards(db_path), new_oracle_path)
+        await asyncio.to_thread(build_similarity_index, lambda: iter_index_cards(db_path), new_similar_path)
+        self.oracle_index.swap(new_oracle_path)
+        self.similar_index.swap(new_similar_path)
+
+    def price_date(self) -> str:
+        """Day the prices in the card index are from"""
+        return (self.index.source_updated_at or '')[:10]
+
+    async def record_prices(self):
+        """Add the card index's prices to the price history, then send watchlist alerts"""
+        date = self.price_date()
+        if not date:
+            return
+
+        days = await asyncio.to_thread(
+            append_snapshot,
+            config.PRICE_HISTORY_PATH,
+            date,
+            price_snapshot(iter_index_cards(config.CARD_INDEX_PATH)),
+            config.PRICE_HISTORY_DAYS
+        )
+        self.price_history.open()
+        print(f'Recorded prices for {date} ({days} days of history)')
+        await self.send_price_alerts()
+
+    async def send_price_alerts(self):
+        """Tell watchers about cards whose price moved past their threshold since the last snapshot"""
+        by_channel = {}
+        for entry, old, new, percent in self.watchlist.check(self.price_history):
+            arrow = '📈' if percent > 0 else '📉'
+            by_channel.setdefault(entry['channel_id'], []).append(
+                f"<@{entry['user_id']}> {arrow} **{entry['name']}** {percent:+.1f}% (${old:.2f} → ${new:.2f})"
+            )
+
+        for channel_id, lines in by_channel.items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                continue
+            message = '\n'.join(lines)
+            if len(message) > 2000:
+                message = message[:1997] + "..."
+            try:
+                await channel.send(message)
+            except discord.HTTPException as e:
+                print(f"Error sending price alerts: {e}")
+
+    async def load_card_names(self):
+        """Rebuild the local name matcher and autocomplete index from the card index"""
+        names = self.index.names()
+        self.matcher = await asyncio.to_thread(FuzzyMatcher.build, names)
+        self.prefix_index = await asyncio.to_thread(PrefixIndex.build, names, config.AUTOCOMPLETE_NAME_MAX)
+        self.known_names = await asyncio.to_thread(
+            BloomFilter.build, (name for name, _ in names), len(names)
+        )
+        self.negative_cache.clear()
+
+    async def load_card_table(self):
+        """Rebuild the columnar search table from the card index"""
+        self.card_table = await asyncio.to_thread(lambda: CardTable(self.index.iter_cards()))
+
+    def lookup_local(self, card_name: str):
+        """Look up an exact card name in the cache or local index, without fuzzy matching"""
+        card_data = self.cache.get_by_name(card_name)
+        if card_data:
+            return card_data
+
+        if self.known_names is not None and normalize_name(card_name) not in self.known_names:
+            # Definitely not a card or face name in the index; skip the query
+            self.bloom_rejections += 1
+            return None
+
+        card_data = self.index.get_by_name(card_name)
+        if card_data:
+            self.cache.put(card_data, query=card_name)
+        return card_data
+
+    def match_local(self, card_name: str):
+        """Resolve a card name locally, including typos and partial names, without any network call"""
+        card_data = self.lookup_local(card_name)
+        if card_data:
+            return card_data
+
+        # Typos, partial names and punctuation variants
+        match = self.matcher.best(card_name)
+        if match:
+            card_data = self.index.get_by_name(match)
+        if card_data:
+            self.cache.put(card_data, query=card_name)
+        return card_data
+
+    def index_is_fresh(self) -> bool:
+        """True if the local index is recent enough to treat a miss as a card that doesn't exist"""
+        if not self.index.imported_at or self.known_names is None:
+            return False
+        return time.time() - self.index.imported_at < config.CARD_INDEX_REFRESH_HOURS * 2 * 60 * 60
+
+    def is_known_miss(self, key: str) -> bool:
+        """True if a normalized name is known not to be a card, without any network call"""
+        if self.negative_cache.get(key):
+            return True
+
+        # Callers only ask after match_local found no exact or close match. A
+        # current index has every card, so leave it to local suggestions.
+        if self.index_is_fresh():
+            self.negative_cache.set(key, True)
+            return True
+        return False
 
     async def search_card(self, card_name: str):
-        """Search for a card using Scryfall API"""
+        """Search for a card in the cache, then the local index, then the Scryfall API
+
+        Returns None if the card doesn't exist. Raises ScryfallError if Scryfall
+        couldn't be reached, so callers can tell "not found" from "try again".
+        """
+        card_data = self.match_local(card_name)
+        if card_data:
+            self.card_looked_up(card_data)
+            return card_data
+
+        key = normalize_name(card_name)
+        if self.is_known_miss(key):
+            return None
+
+        # Only cards newer than the last bulk import should need a network lookup.
+        # Concurrent lookups for the same name share one request.
+        card_data = await self.inflight.do(('named', key), lambda: self.fetch_card_named(card_name))
+        if card_data:
+            self.cache.put(card_data, query=card_name)
+            self.card_looked_up(card_data)
+        else:
+            self.negative_cache.set(key, True)
+        return card_data
+
+    def card_looked_up(self, card_data: dict):
+        """Count a user's lookup toward the cache warmer and prefetch the card's rulings"""
+        self.popularity.add(normalize_name(card_data['name']), card_data['name'])
+        self.prefetch_rulings(card_data)
+
+    async def fetch_card_named(self, card_name: str, priority: int = INTERACTIVE):
+        """Fetch a card from Scryfall's fuzzy named endpoint"""
         params = {
             'fuzzy': card_name
         }
 
-        try:
-            async with self.session.get(config.SCRYFALL_CARD_SEARCH, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 404:
-                    return None
-                else:
-                    return None
-        except Exception as e:
-            print(f"Error searching for card: {e}")
+        response = await self.scheduler.get(config.SCRYFALL_CARD_SEARCH, params=params, priority=priority)
+
+        if response.status == 200:
+            return Card.from_dict(response.json())
+        elif response.status == 404:
             return None
+        else:
+            print(f"Error searching for card: HTTP {response.status}")
+            raise ScryfallError(f'Scryfall returned HTTP {response.status}')
+
+    async def get_rulings(self, card_data: dict, priority: int = INTERACTIVE) -> list:
+        """Get a card's rulings, shared by every printing of the card"""
+        key = card_data.get('oracle_id') or card_data['id']
+        rulings = self.rulings_cache.get(key)
+        if rulings is not None:
+            return rulings
+
+        # Callers share requests at their own priority, so a rulings command never
+        # waits behind a background prefetch of the same card
+        rulings = await self.inflight.do(
+            ('rulings', key, priority), lambda: self.fetch_rulings(card_data['id'], priority)
+        )
+        self.rulings_cache.set(key, rulings)
+        return rulings
+
+    async def fetch_rulings(self, card_id: str, priority: int) -> list:
+        """Fetch rulings for a card from Scryfall"""
+        response = await self.scheduler.get(f"{config.SCRYFALL_API_BASE}/cards/{card_id}/rulings", priority=priority)
+
+        if response.status == 200:
+            return response.json().get('data', [])
+        elif response.status == 404:
+            return []
+        else:
+            raise ScryfallError(f'Scryfall returned HTTP {response.status}')
+
+    def prefetch_rulings(self, card_data: dict):
+        """Start fetching a card's rulings in the background, ahead of a likely rulings command"""
+        if (card_data.get('oracle_id') or card_data['id']) in self.rulings_cache:
+            return
+
+        async def prefetch():
+            try:
+                await self.get_rulings(card_data, priority=BACKGROUND)
+            except Exception as e:
+                print(f"Error prefetching rulings: {e}")
+
+        task = asyncio.create_task(prefetch())
+        self.prefetches.add(task)
+        task.add_done_callback(self.prefetches.discard)
+
+    async def fetch_collection(self, identifiers: list):
+        """Resolve card identifiers through /cards/collection, up to 75 per request
+
+        Returns (cards, not_found) where not_found holds the identifiers Scryfall
+        couldn't match.
+        """
+        cards, not_found = [], []
+        for start in range(0, len(identifiers), config.SCRYFALL_COLLECTION_MAX):
+            chunk = identifiers[start:start + config.SCRYFALL_COLLECTION_MAX]
+            try:
+                response = await self.scheduler.request(
+                    'POST', config.SCRYFALL_COLLECTION, json={'identifiers': chunk}
+                )
+            except ScryfallError as e:
+                print(f"Error fetching card collection: {e}")
+                not_found.extend(chunk)
+                continue
+
+            if response.status != 200:
+                print(f"Error fetching card collection: HTTP {response.status}")
+                not_found.extend(chunk)
+                continue
+
+            data = response.json()
+            cards.extend(Card.from_dict(card) for card in data.get('data', []))
+            not_found.extend(data.get('not_found', []))
+
+        return cards, not_found
+
+    def price_entry(self, card_data: dict, fresh: bool = True) -> dict:
+        """Project the fields a price embed needs and store them in the price cache
+
+        Entries built from card data that wasn't just fetched (bulk data from
+        the local index) are marked stale and not cached.
+        """
+        image_uris = card_data.get('image_uris')
+        if not image_uris and card_data.get('card_faces'):
+            image_uris = card_data['card_faces'][0].get('image_uris')
+
+        entry = {
+            'id': card_data['id'],
+            'name': card_data.get('name', 'Unknown'),
+            'scryfall_uri': card_data.get('scryfall_uri', ''),
+            'prices': {key: (card_data.get('prices') or {}).get(key) for key in ('usd', 'usd_foil', 'eur')},
+            'image': (image_uris or {}).get('small', ''),
+        }
+        if not fresh:
+            entry['stale'] = True
+            return entry
+        self.price_cache.set(entry['id'], entry)
+        return entry
+
+    async def resolve_cards(self, names: list) -> dict:
+        """Resolve many card names with a constant number of requests
+
+        Names are matched locally first; the rest are looked up together
+        through /cards/collection. Returns {name: card data} for names that
+        resolved. Prices of cards fetched here are fresh, so they also prime
+        the price cache.
+        """
+        resolved = {}
+        missing = []
+        for name in names:
+            card_data = self.match_local(name)
+            if card_data:
+                resolved[name] = card_data
+            elif not self.is_known_miss(normalize_name(name)):
+                missing.append(name)
+
+        if missing:
+            cards, _ = await self.fetch_collection([{'name': name} for name in missing])
+            by_name = {}
+            for card in cards:
+                self.price_entry(card)
+                for key, _ in card_names(card):
+                    by_name.setdefault(key, card)
+
+            for name in missing:
+                card_data = by_name.get(normalize_name(name))
+                if card_data:
+                    self.cache.put(card_data, query=name)
+                    resolved[name] = card_data
+
+        return resolved
+
+    async def prices_for_cards(self, cards: list) -> dict:
+        """Get price entries for resolved cards, batching uncached prices into /cards/collection
+
+        Returns {card id: price entry} with an entry for every card. If Scryfall
+        can't be reached, cards fall back to the prices they already carry
+        (from the daily bulk data), marked stale.
+        """
+        entries = {}
+        uncached = {}
+        for card_data in cards:
+            cached = self.price_cache.get(card_data['id'])
+            if cached:
+                entries[card_data['id']] = cached
+            else:
+                uncached[card_data['id']] = card_data
+
+        if uncached:
+            fetched, _ = await self.fetch_collection([{'id': card_id} for card_id in uncached])
+            for card_data in fetched:
+                entries[card_data['id']] = self.price_entry(card_data)
+            for card_id, card_data in uncached.items():
+                if card_id not in entries:
+                    entries[card_id] = self.price_entry(card_data, fresh=False)
+
+        return entries
+
+    async def get_prices(self, names: list):
+        """Get current prices for several cards with as few requests as possible
+
+        Returns (entries, not_found) with entries in request order.
+        """
+        resolved = await self.resolve_cards(names)
+        for name in names:
+            if name not in resolved:
+                # Not an exact name and not in the local index; try a fuzzy lookup
+                card_data = await self.search_card(name)
+                if card_data:
+                    self.price_entry(card_data)
+                    resolved[name] = card_data
+
+        entries = await self.prices_for_cards(list(resolved.values()))
+        found = [entries[resolved[name]['id']] for name in names if name in resolved]
+        not_found = [name for name in names if name not in resolved]
+        return found, not_found
+
+    def not_found_message(self, card_name: str) -> str:
+        """Build a "card not found" reply with local did-you-mean suggestions"""
+        message = f'Card not found: **{card_name}**'
+        suggestions = [name for name, _ in self.matcher.match(card_name, limit=5)]
+        if suggestions:
+            message += '\nDid you mean: ' + ', '.join(f'**{name}**' for name in suggestions) + '?'
+        return message
 
     def get_mana_cost_emoji(self, mana_cost: str) -> str:
-        """Convert mana cost to a readable format"""
+        """Render a mana cost with guild emoji, or readable text for symbols without one"""
         if not mana_cost:
             return "No mana cost"
 
-        # Simple text replacement for common symbols
-        mana_cost = mana_cost.replace('{', '').replace('}', ' ').strip()
-        return mana_cost
+        return self.symbols.render_cost(mana_cost)
+
+    async def load_symbols(self):
+        """Load the symbology table (refreshing it from Scryfall when stale) and map symbols to guild emoji"""
+        self.symbology = await load_symbology(
+            self.scheduler, config.SCRYFALL_API_BASE, config.SYMBOLOGY_PATH, config.SYMBOLOGY_MAX_AGE
+        )
+        self.build_symbols()
+
+    def build_symbols(self):
+        prefix = config.MANA_EMOJI_PREFIX
+        emojis = {emoji.name.lower(): str(emoji) for emoji in self.bot.emojis if emoji.name.lower().startswith(prefix)}
+        self.symbols.build(self.symbology, emojis, prefix)
+        self.embed_cache.clear()  # Cached embeds hold the old rendering
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Guild emoji are only known once connected
+        await self.load_symbols()
+
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.build_symbols()
 
     def get_color_for_card(self, colors) -> int:
         """Get embed color based on card colors"""
@@ -68,6 +585,179 @@ class Cards(commands.Cog):
         # Multicolor
         return 0xF9E084
 
+    async def face_composite(self, card_data: dict):
+        """Path of an image showing every face of a double-faced card side by side, or None
+
+        Each card's composite is downloaded and composed once, then served
+        from the on-disk image cache.
+        """
+        urls = face_image_urls(card_data)
+        if not urls:
+            return None
+
+        path = self.image_cache.get(card_data['id'])
+        if path:
+            return path
+
+        async def compose():
+            try:
+                images = await asyncio.gather(*(self.download_image(url) for url in urls))
+                data = await asyncio.get_running_loop().run_in_executor(self.image_pool, compose_faces, images)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                print(f"Error composing card faces: {e}")
+                return None
+            return self.image_cache.put(card_data['id'], data)
+
+        return await self.inflight.do(('composite', card_data['id']), compose)
+
+    async def download_image(self, url: str) -> bytes:
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def card_message(self, card_data: dict) -> dict:
+        """Keyword arguments for sending a card: its embed, plus both faces as one image for double-faced cards"""
+        embed = self.card_embed(card_data)
+        path = await self.face_composite(card_data)
+        if not path:
+            return {'embed': embed}
+
+        filename = f"{card_data['id']}.jpg"
+        embed.set_image(url=f'attachment://{filename}')
+        return {'embed': embed, 'file': discord.File(path, filename=filename)}
+
+    def card_embed(self, card_data: dict, layout: str = 'full') -> discord.Embed:
+        """Render a card embed, reusing the cached payload for cards rendered before
+
+        The finished embed is cached as Embed.to_dict() keyed by card id and
+        layout, so repeat lookups skip all field building and truncation.
+        Embeds share lists and dicts with the payload they are built from or
+        turned into, so the cache holds its own copy and hands out copies.
+        """
+        key = (card_data.get('id'), layout)
+        cached = self.embed_cache.get(key)
+        if cached:
+            return discord.Embed.from_dict(copy.deepcopy(cached))
+
+        embed = discord.Embed(
+            title=card_data.get('name', 'Unknown'),
+            url=card_data.get('scryfall_uri', ''),
+            description=card_data.get('type_line', ''),
+            color=self.get_color_for_card(card_data.get('colors', []))
+        )
+
+        # Mana cost
+        if 'mana_cost' in card_data:
+            embed.add_field(
+                name="Mana Cost",
+                value=self.get_mana_cost_emoji(card_data['mana_cost']),
+                inline=True
+            )
+
+        # Oracle text, limited to the embed field length
+        if 'oracle_text' in card_data:
+            embed.add_field(
+                name="Text",
+                value=self.symbols.render_text(card_data['oracle_text'], limit=1024),
+                inline=False
+            )
+
+        # Power/Toughness for creatures
+        if 'power' in card_data and 'toughness' in card_data:
+            embed.add_field(
+                name="P/T",
+                value=f"{card_data['power']}/{card_data['toughness']}",
+                inline=True
+            )
+
+        # Loyalty for planeswalkers
+        if 'loyalty' in card_data:
+            embed.add_field(
+                name="Loyalty",
+                value=card_data['loyalty'],
+                inline=True
+            )
+
+        # Set info
+        if 'set_name' in card_data:
+            embed.set_footer(
+                text=f"{card_data['set_name']} • {card_data.get('rarity', 'Unknown').capitalize()}"
+            )
+
+        # Card image
+        if 'image_uris' in card_data:
+            embed.set_image(url=card_data['image_uris'].get('normal', ''))
+        elif 'card_faces' in card_data and card_data['card_faces']:
+            # Double-faced cards
+            if 'image_uris' in card_data['card_faces'][0]:
+                embed.set_image(url=card_data['card_faces'][0]['image_uris'].get('normal', ''))
+
+        if key[0]:
+            self.embed_cache.set(key, copy.deepcopy(embed.to_dict()))
+        return embed
+
+    def mentions_embed(self, cards: list, not_found: list) -> discord.Embed:
+        """Build one compact embed listing several cards mentioned in chat"""
+        lines = []
+        for card_data in cards:
+            line = f"[{card_data.get('name', 'Unknown')}]({card_data.get('scryfall_uri', '')})"
+            if card_data.get('mana_cost'):
+                line += f" {self.get_mana_cost_emoji(card_data['mana_cost'])}"
+            line += f" — {card_data.get('type_line', '')}"
+            usd = (card_data.get('prices') or {}).get('usd')
+            if usd:
+                line += f" · ${usd}"
+            lines.append(line)
+
+        description = '\n'.join(lines)
+        if len(description) > 4096:
+            description = description[:4093] + "..."
+
+        embed = discord.Embed(description=description or "No cards found.", color=config.COLOR_PRIMARY)
+        if not_found:
+            missing = ', '.join(not_found)
+            if len(missing) > 1024:
+                missing = missing[:1021] + "..."
+            embed.add_field(name="Not Found", value=missing, inline=False)
+        return embed
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Reply to [[card name]] mentions in chat with one message for all of them"""
+        content = message.content
+        # Runs on every message the bot sees, so bail out before any real work
+        if '[[' not in content or message.author.bot or content.startswith(config.COMMAND_PREFIX):
+            return
+
+        names = []
+        seen = set()
+        for match in CARD_MENTION.finditer(content):
+            name = match.group(1).strip()
+            key = normalize_name(name)
+            if key and key not in seen:
+                seen.add(key)
+                names.append(name)
+                if len(names) == config.INLINE_CARD_MAX:
+                    break
+        if not names:
+            return
+
+        resolved = await self.resolve_cards(names)
+        cards = []
+        found_ids = set()
+        for name in names:
+            card_data = resolved.get(name)
+            # Two spellings of the same card only show it once
+            if card_data and card_data['id'] not in found_ids:
+                found_ids.add(card_data['id'])
+                cards.append(card_data)
+        not_found = [name for name in names if name not in resolved]
+
+        if len(cards) == 1 and not not_found:
+            await message.reply(**await self.card_message(cards[0]), mention_author=False)
+        else:
+            await message.reply(embed=self.mentions_embed(cards, not_found), mention_author=False)
+
     @commands.command(name='card', aliases=['c'])
     async def search_card_command(self, ctx, *, card_name: str):
         """
@@ -78,182 +768,610 @@ class Cards(commands.Cog):
             card_data = await self.search_card(card_name)
 
             if not card_data:
-                await ctx.send(f'Card not found: **{card_name}**')
+                await ctx.send(self.not_found_message(card_name))
                 return
 
-            # Create embed
-            embed = discord.Embed(
-                title=card_data.get('name', 'Unknown'),
-                url=card_data.get('scryfall_uri', ''),
-                description=card_data.get('type_line', ''),
-                color=self.get_color_for_card(card_data.get('colors', []))
+            await ctx.send(**await self.card_message(card_data))
+
+    @commands.command(name='price')
+    async def card_price(self, ctx, *, card_name: str):
+        """
+        Get the price of a card, or several cards separated by semicolons
+        Example: !mtg price Mana Crypt
+        Example: !mtg price Atraxa, Praetors' Voice; Sol Ring; Rhystic Study
+        """
+        names = [name.strip() for name in CARD_LIST_SEPARATOR.split(card_name) if name.strip()]
+        if len(names) > config.PRICE_MAX_CARDS:
+            await ctx.send(f'Maximum {config.PRICE_MAX_CARDS} cards per price lookup!')
+            return
+
+        async with ctx.typing():
+            entries, not_found = await self.get_prices(names)
+
+            if len(names) == 1:
+                if not_found:
+                    await ctx.send(self.not_found_message(card_name))
+                    return
+                await ctx.send(embed=self.single_price_embed(entries[0]))
+                return
+
+            await ctx.send(embed=self.multi_price_embed(entries, not_found))
+
+    def single_price_embed(self, entry: dict) -> discord.Embed:
+        """Build the price embed for one card"""
+        prices = entry['prices']
+
+        embed = discord.Embed(
+            title=f"{entry['name']} - Prices",
+            url=entry['scryfall_uri'],
+            color=config.COLOR_PRIMARY
+        )
+
+        # USD prices
+        if prices.get('usd'):
+            embed.add_field(name="USD", value=f"${prices['usd']}", inline=True)
+        if prices.get('usd_foil'):
+            embed.add_field(name="USD Foil", value=f"${prices['usd_foil']}", inline=True)
+
+        # EUR prices
+        if prices.get('eur'):
+            embed.add_field(name="EUR", value=f"€{prices['eur']}", inline=True)
+
+        if entry.get('stale'):
+            embed.description = (
+                "Scryfall is unavailable; showing prices from the daily card data."
+                if any(prices.values()) else
+                "Scryfall is unavailable and there is no saved price for this card. Try again in a minute."
             )
+        elif not any(prices.values()):
+            embed.description = "No price data available for this card."
 
-            # Mana cost
-            if 'mana_cost' in card_data:
-                embed.add_field(
-                    name="Mana Cost",
-                    value=self.get_mana_cost_emoji(card_data['mana_cost']),
-                    inline=True
-                )
+        # Card thumbnail
+        if entry['image']:
+            embed.set_thumbnail(url=entry['image'])
 
-            # Oracle text
-            if 'oracle_text' in card_data:
-                oracle_text = card_data['oracle_text']
-                # Limit oracle text length for embed
-                if len(oracle_text) > 1024:
-                    oracle_text = oracle_text[:1021] + "..."
-                embed.add_field(
-                    name="Text",
-                    value=oracle_text,
-                    inline=False
-                )
+        return embed
 
-            # Power/Toughness for creatures
-            if 'power' in card_data and 'toughness' in card_data:
-                embed.add_field(
-                    name="P/T",
-                    value=f"{card_data['power']}/{card_data['toughness']}",
-                    inline=True
-                )
+    def multi_price_embed(self, entries: list, not_found: list) -> discord.Embed:
+        """Build one combined price embed with per-card lines and totals"""
+        lines = []
+        total_usd = 0.0
+        total_eur = 0.0
+        for entry in entries:
+            prices = entry['prices']
+            parts = []
+            if prices.get('usd'):
+                parts.append(f"${prices['usd']}")
+                total_usd += float(prices['usd'])
+            if prices.get('usd_foil'):
+                parts.append(f"foil ${prices['usd_foil']}")
+            if prices.get('eur'):
+                parts.append(f"€{prices['eur']}")
+                total_eur += float(prices['eur'])
+            missing_price = 'price unavailable' if entry.get('stale') else 'no price data'
+            marker = ' *' if entry.get('stale') else ''
+            lines.append(f"[{entry['name']}]({entry['scryfall_uri']}) — {' · '.join(parts) or missing_price}{marker}")
 
-            # Loyalty for planeswalkers
-            if 'loyalty' in card_data:
-                embed.add_field(
-                    name="Loyalty",
-                    value=card_data['loyalty'],
-                    inline=True
-                )
+        description = '\n'.join(lines)
+        if len(description) > 4096:
+            description = description[:4093] + "..."
 
-            # Set info
-            if 'set_name' in card_data:
-                embed.set_footer(
-                    text=f"{card_data['set_name']} • {card_data.get('rarity', 'Unknown').capitalize()}"
-                )
+        embed = discord.Embed(
+            title=f"💰 Prices ({len(entries)} card{'s' if len(entries) != 1 else ''})",
+            description=description or "No cards found.",
+            color=config.COLOR_PRIMARY
+        )
+        embed.add_field(name="Total USD", value=f"${total_usd:.2f}", inline=True)
+        embed.add_field(name="Total EUR", value=f"€{total_eur:.2f}", inline=True)
+
+        if not_found:
+            missing = ', '.join(not_found)
+            if len(missing) > 1024:
+                missing = missing[:1021] + "..."
+            embed.add_field(name="Not Found", value=missing, inline=False)
+        if any(entry.get('stale') for entry in entries):
+            embed.set_footer(text="* Scryfall is unavailable; price from the daily card data")
+
+        return embed
+
+    @commands.command(name='pricehistory', aliases=['ph'])
+    async def price_history_command(self, ctx, *, card_name: str):
+        """
+        Show how a card's price has moved over time
+        Example: !mtg pricehistory Rhystic Study
+        """
+        card_data = await self.search_card(card_name)
+        if not card_data:
+            await ctx.send(self.not_found_message(card_name))
+            return
+
+        history = self.price_history.history(card_data)
+        summary = summarize(history) if history is not None else None
+        if not summary or not summary['latest']:
+            await ctx.send(f"No price history for **{card_data['name']}** yet. Prices are recorded once a day.")
+            return
+
+        await ctx.send(embed=self.price_history_embed(card_data, summary))
+
+    def price_history_embed(self, card_data: dict, summary: dict) -> discord.Embed:
+        """Build the price history embed: current prices, USD trend and range"""
+        embed = discord.Embed(
+            title=f"📊 {card_data['name']} - Price History",
+            url=card_data.get('scryfall_uri', ''),
+            description=f"`{summary['spark']}`" if summary['spark'] else None,
+            color=config.COLOR_PRIMARY
+        )
+
+        latest = summary['latest']
+        if 'usd' in latest:
+            embed.add_field(name="USD", value=f"${latest['usd']:.2f}", inline=True)
+        if 'usd_foil' in latest:
+            embed.add_field(name="USD Foil", value=f"${latest['usd_foil']:.2f}", inline=True)
+        if 'eur' in latest:
+            embed.add_field(name="EUR", value=f"€{latest['eur']:.2f}", inline=True)
+
+        days_recorded = len(self.price_history)
+        lines = []
+        for days, (old, new, percent) in summary['changes'].items():
+            label = 'All time' if days == days_recorded - 1 else f"{days} day{'s' if days != 1 else ''}"
+            arrow = '📈' if percent > 0 else '📉' if percent < 0 else '➖'
+            lines.append(f"{arrow} {label}: {percent:+.1f}% (${old:.2f} → ${new:.2f})")
+        if lines:
+            embed.add_field(name="USD Trend", value='\n'.join(lines), inline=False)
+        if summary['low'] is not None:
+            embed.add_field(name="Range", value=f"${summary['low']:.2f} – ${summary['high']:.2f}", inline=False)
+
+        embed.set_footer(text=f"{days_recorded} day{'s' if days_recorded != 1 else ''} recorded • "
+                              f"since {self.price_history.dates[0]}")
+        return embed
+
+    @commands.command(name='watch')
+    async def watch_card(self, ctx, *, card_name: str):
+        """
+        Get pinged here when a card's price moves by more than a percentage in a day
+        Example: !mtg watch The One Ring 15%
+        """
+        threshold = config.PRICE_ALERT_THRESHOLD
+        match = WATCH_THRESHOLD.search(card_name)
+        if match:
+            threshold = float(match.group(1))
+            card_name = card_name[:match.start()]
+
+        card_data = await self.search_card(card_name)
+        if not card_data:
+            await ctx.send(self.not_found_message(card_name))
+            return
+
+        watched = self.watchlist.for_user(ctx.author.id)
+        if len(watched) >= config.WATCHLIST_MAX and card_data['name'] not in [entry['name'] for entry in watched]:
+            await ctx.send(f'Maximum {config.WATCHLIST_MAX} watched cards! Remove one with `{config.COMMAND_PREFIX} unwatch`.')
+            return
 
-            # Card image
-            if 'image_uris' in card_data:
-                embed.set_image(url=card_data['image_uris'].get('normal', ''))
-            elif 'card_faces' in card_data and card_data['card_faces']:
-                # Double-faced cards
-                if 'image_uris' in card_data['card_faces'][0]:
-                    embed.set_image(url=card_data['card_faces'][0]['image_uris'].get('normal', ''))
+        self.watchlist.add(ctx.author.id, ctx.channel.id, card_data, threshold)
+        self.watchlist.save()
+        await ctx.send(f"👀 Watching **{card_data['name']}**. I'll ping you here if it moves {threshold:g}% in a day.")
 
+    @commands.command(name='unwatch')
+    async def unwatch_card(self, ctx, *, card_name: str):
+        """
+        Stop watching a card's price
+        Example: !mtg unwatch The One Ring
+        """
+        card_data = await self.search_card(card_name)
+        if not card_data or not self.watchlist.remove(ctx.author.id, card_data):
+            await ctx.send(f'You are not watching **{card_name}**.')
+            return
+
+        self.watchlist.save()
+        await ctx.send(f"Stopped watching **{card_data['name']}**.")
+
+    @commands.command(name='watchlist')
+    async def show_watchlist(self, ctx):
+        """List the cards you are watching"""
+        watched = self.watchlist.for_user(ctx.author.id)
+        if not watched:
+            await ctx.send(f'You are not watching any cards. Try `{config.COMMAND_PREFIX} watch Sol Ring`.')
+            return
+
+        embed = discord.Embed(
+            title=f"👀 {ctx.author.display_name}'s Watchlist",
+            description='\n'.join(f"**{entry['name']}** — {entry['threshold']:g}%" for entry in watched),
+            color=config.COLOR_PRIMARY
+        )
+        embed.set_footer(text="Alerts are checked once a day when prices update")
+        await ctx.send(embed=embed)
+
+    @commands.command(name='search')
+    async def search_cards(self, ctx, *, query: str):
+        """
+        Search cards with Scryfall syntax, locally when possible
+        Example: !mtg search c:ug t:instant cmc<=2 id<=wubrg
+        """
+        source = None
+        if len(self.card_table):
+            started = time.perf_counter()
+            try:
+                rows = self.card_table.search(query)
+                source = LocalSearchPages(self.card_table, rows, query, (time.perf_counter() - started) * 1000)
+            except SearchError:
+                pass  # Syntax the local engine doesn't support; let Scryfall try
+
+        if source is None:
+            source = ScryfallSearchPages(self.scheduler, query)
+
+        paginator = Paginator(source, ctx.author.id)
+        async with ctx.typing():
+            try:
+                items = await paginator.get_page(0)
+            except SearchError as e:
+                await ctx.send(f'Invalid search: {e}')
+                return
+
+        if not source.total:
+            await ctx.send(f'No cards found for: **{query}**')
+            return
+
+        if source.total == 1:
+            card_data = self.index.get_by_id(items[0]['id']) if 'id' in items[0] else None
+            if card_data:
+                async with ctx.typing():
+                    await ctx.send(**await self.card_message(card_data))
+                return
+
+        await paginator.start(ctx)
+
+    @commands.command(name='oracle')
+    async def oracle_search(self, ctx, *, query: str):
+        """
+        Find cards by rules text, best match first. Quote a phrase to require it exactly.
+        Example: !mtg oracle whenever a creature dies, draw a card
+        """
+        if not len(self.oracle_index):
+            await ctx.send('The card index is still loading. Try again in a few minutes.')
+            return
+
+        results = self.oracle_index.search(query, limit=10)
+        cards = [card for card in (self.index.get_by_id(card_id) for card_id, _ in results) if card]
+        if not cards:
+            await ctx.send(f'No cards found with text: **{query}**')
+            return
+
+        content = None
+        if len(cards) > 1:
+            content = 'Also matching: ' + ', '.join(f"**{card['name']}**" for card in cards[1:])
+
+        async with ctx.typing():
+            await ctx.send(content=content, **await self.card_message(cards[0]))
+
+    @commands.command(name='rulings')
+    async def card_rulings(self, ctx, *, card_name: str):
+        """
+        Show official rulings for a card
+        Example: !mtg rulings Blood Moon
+        """
+        async with ctx.typing():
+            card_data = await self.search_card(card_name)
+            if not card_data:
+                await ctx.send(self.not_found_message(card_name))
+                return
+
+            rulings = await self.get_rulings(card_data)
+
+        embed = discord.Embed(
+            title=f"📜 {card_data['name']} - Rulings",
+            url=card_data.get('scryfall_uri', ''),
+            color=config.COLOR_PRIMARY
+        )
+        if not rulings:
+            embed.description = "No rulings for this card."
             await ctx.send(embed=embed)
+            return
 
-    @commands.command(name='price')
-    async def card_price(self, ctx, *, card_name: str):
+        lines = []
+        length = 0
+        for ruling in rulings:
+            line = f"**{ruling.get('published_at', '')}** {ruling.get('comment', '')}"
+            if length + len(line) + 2 > 4000:
+                lines.append(f"…and {len(rulings) - len(lines)} more on Scryfall")
+                break
+            lines.append(line)
+            length += len(line) + 2
+        embed.description = '\n\n'.join(lines)
+        embed.set_footer(text=f"{len(rulings)} ruling{'s' if len(rulings) != 1 else ''}")
+        await ctx.send(embed=embed)
+
+    @commands.command(name='similar')
+    async def similar_cards(self, ctx, *, card_name: str):
         """
-        Get the price of a card
-        Example: !mtg price Mana Crypt
+        Find cards that do similar things
+        Example: !mtg similar Blood Artist
         """
+        if not len(self.similar_index):
+            await ctx.send('The card index is still loading. Try again in a few minutes.')
+            return
+
         async with ctx.typing():
             card_data = await self.search_card(card_name)
 
             if not card_data:
-                await ctx.send(f'Card not found: **{card_name}**')
+                await ctx.send(self.not_found_message(card_name))
+                return
+
+            results = self.similar_index.most_similar(card_data, limit=10)
+            if not results:
+                await ctx.send(f"Couldn't find cards similar to **{card_data['name']}**.")
                 return
 
-            prices = card_data.get('prices', {})
+            lines = []
+            for card_id, score in results:
+                similar = self.index.get_by_id(card_id)
+                if similar:
+                    lines.append(
+                        f"[{similar['name']}]({similar.get('scryfall_uri', '')}) — {similar.get('type_line', '')} "
+                        f"({score * 100:.0f}%)"
+                    )
 
             embed = discord.Embed(
-                title=f"{card_data.get('name', 'Unknown')} - Prices",
+                title=f"Cards similar to {card_data['name']}",
                 url=card_data.get('scryfall_uri', ''),
-                color=config.COLOR_PRIMARY
+                description='\n'.join(lines),
+                color=self.get_color_for_card(card_data.get('colors', []))
             )
+            image_uris = card_data.get('image_uris') or (card_data.get('card_faces') or [{}])[0].get('image_uris')
+            if image_uris:
+                embed.set_thumbnail(url=image_uris.get('small', ''))
 
-            # USD prices
-            if prices.get('usd'):
-                embed.add_field(name="USD", value=f"${prices['usd']}", inline=True)
-            if prices.get('usd_foil'):
-                embed.add_field(name="USD Foil", value=f"${prices['usd_foil']}", inline=True)
+            await ctx.send(embed=embed)
 
-            # EUR prices
-            if prices.get('eur'):
-                embed.add_field(name="EUR", value=f"€{prices['eur']}", inline=True)
+    @commands.command(name='deck')
+    async def analyze_deck(self, ctx, *, decklist: str = None):
+        """
+        Analyze a pasted or attached decklist (Moxfield / Archidekt text export)
+        Example: !mtg deck (with a .txt attachment)
+        """
+        if ctx.message.attachments:
+            attachment = ctx.message.attachments[0]
+            if attachment.size > config.DECK_MAX_BYTES:
+                await ctx.send('That decklist file is too large.')
+                return
+            decklist = (await attachment.read()).decode('utf-8', errors='replace')
 
-            if not any(prices.values()):
-                embed.description = "No price data available for this card."
+        if not decklist:
+            await ctx.send(f'Paste a decklist after `{config.COMMAND_PREFIX} deck` or attach a .txt export.')
+            return
 
-            # Card thumbnail
-            if 'image_uris' in card_data:
-                embed.set_thumbnail(url=card_data['image_uris'].get('small', ''))
+        deck = parse_decklist(decklist)
+        names = deck.names
+        if not names:
+            await ctx.send("I couldn't find any cards in that decklist.")
+            return
+        if len(names) > config.DECK_MAX_CARDS:
+            await ctx.send(f'Maximum {config.DECK_MAX_CARDS} different cards per decklist!')
+            return
 
-            await ctx.send(embed=embed)
+        async with ctx.typing():
+            resolved = await self.resolve_cards(names)
+            entries = await self.prices_for_cards(list(resolved.values()))
+
+            cards, prices = {}, {}
+            for name, card_data in resolved.items():
+                key = normalize_name(name)
+                cards[key] = card_data
+                entry_prices = entries.get(card_data['id'], {}).get('prices', {})
+                price = entry_prices.get('usd') or entry_prices.get('usd_foil')
+                prices[key] = float(price) if price else None
+
+            analysis = DeckAnalysis(deck, cards, prices)
+            await ctx.send(embed=self.deck_embed(deck, analysis))
+
+    def deck_embed(self, deck, analysis: DeckAnalysis) -> discord.Embed:
+        """Build the deck analysis embed"""
+        commanders = ' & '.join(analysis.commander_names) or 'No commander'
+        embed = discord.Embed(
+            title=f"📋 Deck Analysis — {commanders}",
+            description=f"{deck.card_count} cards • {analysis.lands} lands • Color identity: {analysis.identity_string}",
+            color=self.get_color_for_card(sorted(analysis.identity))
+        )
+
+        peak = max(analysis.curve.values(), default=0)
+        curve_lines = []
+        for cmc in range(CURVE_MAX + 1):
+            count = analysis.curve.get(cmc, 0)
+            bar = '█' * round(count / peak * 12) if peak else ''
+            label = f"{cmc}+" if cmc == CURVE_MAX else f"{cmc} "
+            curve_lines.append(f"`{label}` {bar} {count}")
+        embed.add_field(name="Mana Curve", value='\n'.join(curve_lines), inline=True)
+
+        pips = ' · '.join(f"{color} {analysis.pips[color]}" for color in 'WUBRG' if analysis.pips[color])
+        embed.add_field(name="Color Pips", value=pips or "None", inline=True)
+
+        if not analysis.commander_names:
+            legality = "No commander found; add a `Commander` section to check color identity."
+        elif analysis.outside_identity:
+            legality = f"⚠️ {len(analysis.outside_identity)} outside identity: " + ', '.join(analysis.outside_identity)
+        else:
+            legality = "✅ Every card fits the commander's color identity."
+        if len(legality) > 1024:
+            legality = legality[:1021] + "..."
+        embed.add_field(name="Color Identity", value=legality, inline=False)
+
+        price = f"${analysis.total_price:.2f}"
+        if analysis.unpriced:
+            price += f" ({len(analysis.unpriced)} cards without a price)"
+        embed.add_field(name="Total Price (USD)", value=price, inline=False)
+
+        if analysis.not_found:
+            missing = ', '.join(analysis.not_found)
+            if len(missing) > 1024:
+                missing = missing[:1021] + "..."
+            embed.add_field(name="Not Found", value=missing, inline=False)
+
+        return embed
 
     @commands.command(name='random')
-    async def random_card(self, ctx):
-        """Get a random MTG card"""
-        async with ctx.typing():
+    async def random_card(self, ctx, *, filters: str = ''):
+        """
+        Get a random MTG card, optionally matching search filters
+        Example: !mtg random legendary creature c:g
+        """
+        if len(self.card_table):
             try:
-                url = f"{config.SCRYFALL_API_BASE}/cards/random"
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        card_data = await response.json()
-                        # Reuse the card display logic
-                        await ctx.invoke(self.bot.get_command('card'), card_name=card_data['name'])
-                    else:
-                        await ctx.send("Failed to get a random card.")
-            except Exception as e:
-                await ctx.send(f"Error: {str(e)}")
+                row = self.card_table.sample(filters)
+            except SearchError:
+                pass  # Syntax the local engine doesn't support; let Scryfall try
+            else:
+                if row is None:
+                    await ctx.send(f'No cards found for: **{filters}**')
+                    return
 
+                card_data = self.index.get_by_id(self.card_table.ids[row])
+                if card_data:
+                    async with ctx.typing():
+                        await ctx.send(**await self.card_message(card_data))
+                    return
 
-    # Slash Commands
-    @app_commands.command(name="card", description="Search for an MTG card")
-    @app_commands.describe(name="Card name to search for")
-    async def slash_card(self, interaction: discord.Interaction, name: str):
-        """Search for a card via slash command"""
-        await interaction.response.defer()  # Card search might take a moment
+        # The card index is still loading, or the filter needs Scryfall
+        async with ctx.typing():
+            params = {'q': filters} if filters else None
+            response = await self.scheduler.get(
+                f"{config.SCRYFALL_API_BASE}/cards/random", params=params, cache=False
+            )
 
-        card_data = await self.search_card(name)
+            if response.status == 200:
+                card_data = Card.from_dict(response.json())
+                self.cache.put(card_data)
+                await ctx.send(**await self.card_message(card_data))
+            elif response.status == 404:
+                await ctx.send(f'No cards found for: **{filters}**')
+            elif response.status == 400:
+                details = response.json().get('details', 'Scryfall could not understand that filter')
+                await ctx.send(f'Invalid filter: {details}')
+            else:
+                raise ScryfallError(f'Scryfall returned HTTP {response.status}')
 
-        if not card_data:
-            await interaction.followup.send(f'Card not found: **{name}**')
-            return
+    @commands.command(name='cachestats')
+    @commands.is_owner()
+    async def cache_stats(self, ctx):
+        """Show card cache statistics (Owner only)"""
+        stats = self.cache.stats
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = (stats['hits'] / lookups * 100) if lookups else 0
 
-        # Create embed (same as prefix command)
-        embed = discord.Embed(
-            title=card_data.get('name', 'Unknown'),
-            url=card_data.get('scryfall_uri', ''),
-            description=card_data.get('type_line', ''),
-            color=self.get_color_for_card(card_data.get('colors', []))
+        embed = discord.Embed(title="Card Cache", color=config.COLOR_PRIMARY)
+        embed.add_field(name="Cards", value=f"{stats['entries']}/{config.CARD_CACHE_SIZE}", inline=True)
+        embed.add_field(name="Aliases", value=str(stats['aliases']), inline=True)
+        embed.add_field(name="Size", value=f"{stats['bytes'] / 1024:.0f} KiB", inline=True)
+        embed.add_field(name="Hits", value=str(stats['hits']), inline=True)
+        embed.add_field(name="Misses", value=str(stats['misses']), inline=True)
+        embed.add_field(name="Hit Rate", value=f"{hit_rate:.1f}%", inline=True)
+        embed.add_field(name="Cached Prices", value=str(len(self.price_cache)), inline=True)
+        images = self.image_cache.stats
+        embed.add_field(
+            name="Card Images",
+            value=f"{images['entries']} ({images['bytes'] / 1024 / 1024:.1f} MiB, {images['hits']} hits)",
+            inline=True
+        )
+        embed.add_field(
+            name="Cached Rulings",
+            value=f"{len(self.rulings_cache)} ({self.rulings_cache.hits} hits, {len(self.prefetches)} prefetching)",
+            inline=True
+        )
+        embed.add_field(
+            name="Known Misses",
+            value=f"{len(self.negative_cache)} cached, {self.negative_cache.hits} hits, "
+                  f"{self.bloom_rejections} index lookups skipped by name filter",
+            inline=False
         )
+        inflight = self.inflight.stats
+        embed.add_field(
+            name="Coalesced Lookups",
+            value=f"{inflight['collapsed']} joined / {inflight['calls']} requests",
+            inline=False
+        )
+        scheduler = self.scheduler.stats
+        embed.add_field(
+            name="Scryfall Requests",
+            value=(
+                f"{scheduler['requests']} sent, {scheduler['retries']} retried, "
+                f"{scheduler['throttled']} throttled, {scheduler['failures']} failed\n"
+                f"Queue depth: {scheduler['queue_depth']}\n"
+                f"Interactive wait: {scheduler['interactive_wait_avg'] * 1000:.0f} ms avg, "
+                f"{scheduler['interactive_wait_max'] * 1000:.0f} ms max\n"
+                f"Background wait: {scheduler['background_wait_avg'] * 1000:.0f} ms avg, "
+                f"{scheduler['background_wait_max'] * 1000:.0f} ms max"
+            ),
+            inline=False
+        )
+        http = self.http_cache.stats
+        embed.add_field(
+            name="HTTP Cache",
+            value=(
+                f"{http['entries']} responses, {http['bytes'] / 1024:.0f} KiB\n"
+                f"{http['hits']} fresh, {http['stale_hits']} stale, {http['revalidated']} revalidated, "
+                f"{http['offline_hits']} offline, {http['misses']} misses"
+            ),
+            inline=False
+        )
+        embed.set_footer(text=f"Evictions: {stats['evictions']}")
 
-        if 'mana_cost' in card_data:
-            embed.add_field(
-                name="Mana Cost",
-                value=self.get_mana_cost_emoji(card_data['mana_cost']),
-                inline=True
-            )
+        await ctx.send(embed=embed)
 
-        if 'oracle_text' in card_data:
-            oracle_text = card_data['oracle_text']
-            if len(oracle_text) > 1024:
-                oracle_text = oracle_text[:1021] + "..."
-            embed.add_field(name="Text", value=oracle_text, inline=False)
+    @commands.command(name='topcards')
+    @commands.is_owner()
+    async def top_cards(self, ctx, count: int = 20):
+        """Show the most looked-up cards, as kept warm by the cache warmer (Owner only)"""
+        count = max(1, min(count, 50))
+        ranked = self.popularity.most_common(count)
+        if not ranked:
+            await ctx.send("No card lookups recorded yet.")
+            return
 
-        if 'power' in card_data and 'toughness' in card_data:
-            embed.add_field(
-                name="P/T",
-                value=f"{card_data['power']}/{card_data['toughness']}",
-                inline=True
-            )
+        lines = []
+        for position, (_, name, estimate) in enumerate(ranked, 1):
+            warm = '🔥' if self.cache.peek(name) else '❄️'
+            lines.append(f"{position}. {warm} **{name}** — ~{estimate} lookup{'s' if estimate != 1 else ''}")
 
-        if 'loyalty' in card_data:
-            embed.add_field(name="Loyalty", value=card_data['loyalty'], inline=True)
+        embed = discord.Embed(title="Most Looked-Up Cards", description='\n'.join(lines), color=config.COLOR_PRIMARY)
+        sketch = self.popularity.sketch
+        embed.set_footer(
+            text=f"{self.popularity.lookups} lookups counted • tracking top {len(self.popularity)}/"
+                 f"{self.popularity.top_size} • {sketch.depth}x{sketch.width} sketch • 🔥 cached"
+        )
+        await ctx.send(embed=embed)
 
-        if 'set_name' in card_data:
-            embed.set_footer(
-                text=f"{card_data['set_name']} • {card_data.get('rarity', 'Unknown').capitalize()}"
-            )
+    # Slash Commands
+    @app_commands.command(name="card", description="Search for an MTG card")
+    @app_commands.describe(name="Card name to search for")
+    async def slash_card(self, interaction: discord.Interaction, name: str):
+        """Search for a card via slash command"""
+        # Names picked from autocomplete resolve locally, so only defer for a real search
+        card_data = self.lookup_local(name)
+        if card_data:
+            self.card_looked_up(card_data)
+        if card_data and (card_data['id'] in self.image_cache or not face_image_urls(card_data)):
+            send = interaction.response.send_message
+        else:
+            await interaction.response.defer()  # Card search or image composing might take a moment
+            send = interaction.followup.send
+            try:
+                card_data = card_data or await self.search_card(name)
+            except ScryfallError:
+                await send("Scryfall isn't responding right now. Try again in a minute.")
+                return
 
-        if 'image_uris' in card_data:
-            embed.set_image(url=card_data['image_uris'].get('normal', ''))
-        elif 'card_faces' in card_data and card_data['card_faces']:
-            if 'image_uris' in card_data['card_faces'][0]:
-                embed.set_image(url=card_data['card_faces'][0]['image_uris'].get('normal', ''))
+        if not card_data:
+            await send(self.not_found_message(name))
+            return
+
+        await send(**await self.card_message(card_data))
 
-        await interaction.followup.send(embed=embed)
+    @slash_card.autocomplete('name')
+    async def slash_card_autocomplete(self, interaction: discord.Interaction, current: str):
+        """Suggest card names from the local prefix index"""
+        return [
+            app_commands.Choice(name=card_name, value=card_name)
+            for card_name in self.prefix_index.complete(current, limit=25)
+        ]
 
     @app_commands.command(name="roll", description="Roll dice")
     @app_commands.describe(dice="Dice notation (e.g., d20, 2d6, 4d8)")
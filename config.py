@@ -13,9 +13,97 @@ STARTING_LIFE = 40  # Commander starting life total
 MAX_PLAYERS = 4
 MIN_PLAYERS = 2
 
+# Shared HTTP client
+USER_AGENT = 'MTGCommanderBot/1.0'  # Scryfall requires a User-Agent and Accept header
+HTTP_POOL_SIZE = 32  # Max open connections across all hosts
+HTTP_POOL_PER_HOST = 8
+HTTP_TIMEOUT = 30  # Seconds for a whole request
+HTTP_CONNECT_TIMEOUT = 10
+
 # Scryfall API
 SCRYFALL_API_BASE = 'https://api.scryfall.com'
 SCRYFALL_CARD_SEARCH = f'{SCRYFALL_API_BASE}/cards/named'
+SCRYFALL_COLLECTION = f'{SCRYFALL_API_BASE}/cards/collection'
+SCRYFALL_COLLECTION_MAX = 75  # Max identifiers per /cards/collection request
+SCRYFALL_SEARCH = f'{SCRYFALL_API_BASE}/cards/search'
+SCRYFALL_SEARCH_PAGE_SIZE = 175  # Cards per /cards/search response page
+SCRYFALL_RATE_LIMIT = 10  # Requests per second Scryfall asks clients to stay under
+SCRYFALL_MAX_RETRIES = 3
+
+# Local data (caches, indexes)
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+# Card lookup cache
+CARD_CACHE_SIZE = int(os.getenv('CARD_CACHE_SIZE', '2000'))  # Max cached cards
+CARD_CACHE_MAX_BYTES = int(os.getenv('CARD_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+CARD_CACHE_TTL = 60 * 60 * 24  # Seconds before a cached card is refetched
+CARD_CACHE_PATH = os.path.join(DATA_DIR, 'card_cache.json')
+EMBED_CACHE_SIZE = 1000  # Rendered card embeds
+NEGATIVE_CACHE_SIZE = 5000  # Recent lookups that matched no card
+NEGATIVE_CACHE_TTL = 60 * 60
+
+# Persistent HTTP response cache
+HTTP_CACHE_PATH = os.path.join(DATA_DIR, 'http_cache.db')
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+HTTP_CACHE_FRESH_TTL = 60 * 60 * 6  # Serve without revalidating (unless Cache-Control says otherwise)
+HTTP_CACHE_STALE_TTL = 60 * 60 * 24 * 7  # Serve stale while revalidating in the background
+
+# Price cache (prices change daily, card text doesn't)
+PRICE_CACHE_SIZE = 5000
+PRICE_CACHE_TTL = 60 * 60 * 24
+PRICE_MAX_CARDS = 75  # Max cards in one multi-card price lookup
+
+# Price history, recorded daily from the card index
+PRICE_HISTORY_PATH = os.path.join(DATA_DIR, 'price_history.f32')
+PRICE_HISTORY_DAYS = 365
+WATCHLIST_PATH = os.path.join(DATA_DIR, 'watchlist.json')
+WATCHLIST_MAX = 25  # Max watched cards per user
+PRICE_ALERT_THRESHOLD = 10.0  # Default percent change in a day that triggers an alert
+
+# Paginated search results
+SEARCH_PAGE_SIZE = 20  # Cards per embed page
+SEARCH_PAGE_CACHE_SIZE = 50  # Visited pages kept per search message
+SEARCH_PAGE_TTL = 10 * 60
+SEARCH_VIEW_TIMEOUT = 5 * 60  # Buttons stop working after this long without a click
+
+# Mana symbols: Scryfall's symbology table, and guild emoji named mana_<symbol> (mana_w, mana_wu, mana_gp, mana_t)
+SYMBOLOGY_PATH = os.path.join(DATA_DIR, 'symbology.json')
+SYMBOLOGY_MAX_AGE = 60 * 60 * 24 * 30  # New symbols are rare
+MANA_EMOJI_PREFIX = os.getenv('MANA_EMOJI_PREFIX', 'mana_')
+
+# Double-faced card images, both faces composed into one attachment
+IMAGE_CACHE_DIR = os.path.join(DATA_DIR, 'images')
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(128 * 1024 * 1024)))
+IMAGE_WORKERS = 2  # Threads composing images, so imaging never blocks the event loop
+
+# Rulings, prefetched whenever a card is looked up
+RULINGS_CACHE_SIZE = 2000
+RULINGS_CACHE_TTL = 60 * 60 * 24 * 7  # Rulings are rarely added
+
+# Card popularity: a sketch of lookups, and a warmer that keeps the most looked-up cards cached
+POPULARITY_PATH = os.path.join(DATA_DIR, 'popularity.npz')
+POPULARITY_TOP_SIZE = 300  # Most looked-up cards tracked and kept warm
+POPULARITY_WARM_MINUTES = 15
+POPULARITY_WARM_MAX_REQUESTS = 50  # Scryfall requests per warm pass, leaving the rest of the budget to users
+POPULARITY_DECAY_DAYS = 7  # Counts halve this often, so the ranking follows current play
+
+# Inline [[card name]] mentions in chat
+INLINE_CARD_MAX = 10  # Max mentions answered per message
+INLINE_CARD_NAME_MAX = 150  # Longer bracketed text isn't a card name
+
+# Slash command autocomplete
+AUTOCOMPLETE_NAME_MAX = 100  # Discord rejects longer choices, failing the whole response
+
+# Decklist analysis
+DECK_MAX_CARDS = 250  # Max distinct cards in one decklist
+DECK_MAX_BYTES = 64 * 1024  # Max attached decklist size
+
+# Offline card index built from Scryfall bulk data
+CARD_INDEX_PATH = os.path.join(DATA_DIR, 'cards.db')
+CARD_INDEX_BULK_TYPE = os.getenv('CARD_INDEX_BULK_TYPE', 'oracle-cards')  # or 'default-cards'
+CARD_INDEX_REFRESH_HOURS = 24
+ORACLE_INDEX_PATH = os.path.join(DATA_DIR, 'oracle.idx')
+SIMILAR_INDEX_PATH = os.path.join(DATA_DIR, 'similar.npz')
 
 # Embed colors
 COLOR_PRIMARY = 0x7289DA
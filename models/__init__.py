@@ -1,3 +1,4 @@
+from .card import Card, CardFace
 from .game import Player, CommanderGame
 
-__all__ = ['Player', 'CommanderGame']
+__all__ = ['Card', 'CardFace', 'Player', 'CommanderGame']
@@ -0,0 +1,176 @@
+"""Compact card model holding only the fields the bot renders
+
+A Scryfall card object is several KB of JSON (legalities, every URI, all
+prices, purchase links). Card keeps the fields the embeds, prices and deck
+analysis use, in __slots__, with strings that repeat across thousands of
+cards (type lines, set names, rarities, costs) interned so each distinct
+value is stored once.
+
+Cards support read-only dict access (card.get('name'), card['id'],
+'oracle_text' in card), so they stand in for the Scryfall JSON they replace.
+
+Compare per-card memory against raw dicts with:
+    python -m models.card data/oracle-cards.json
+"""
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+# Fields the Cards cog renders; everything else in Scryfall card objects is dropped
+CARD_FIELDS = (
+    'id', 'oracle_id', 'name', 'layout', 'released_at', 'scryfall_uri',
+    'mana_cost', 'cmc', 'type_line', 'oracle_text', 'power', 'toughness', 'loyalty',
+    'colors', 'color_identity', 'set_name', 'rarity',
+)
+FACE_FIELDS = (
+    'name', 'mana_cost', 'type_line', 'oracle_text', 'power', 'toughness', 'loyalty', 'colors',
+)
+IMAGE_SIZES = ('small', 'normal')
+PRICE_FIELDS = ('usd', 'usd_foil', 'eur')
+
+# Values shared by many cards; interning keeps one copy of each
+INTERNED_FIELDS = frozenset((
+    'layout', 'released_at', 'mana_cost', 'type_line', 'power', 'toughness', 'loyalty', 'set_name', 'rarity',
+))
+LIST_FIELDS = frozenset(('colors', 'color_identity'))
+
+
+def project_images(image_uris: Optional[dict]) -> Optional[Dict[str, str]]:
+    if not image_uris:
+        return None
+    return {size: image_uris[size] for size in IMAGE_SIZES if size in image_uris} or None
+
+
+def _value(field: str, value):
+    if value is None:
+        return None
+    if field in INTERNED_FIELDS and isinstance(value, str):
+        return sys.intern(value)
+    if field in LIST_FIELDS:
+        return tuple(sys.intern(item) for item in value)
+    return value
+
+
+class _Record:
+    """Read-only dict-style access to the slots of a record"""
+
+    __slots__ = ()
+    _fields = frozenset()
+
+    def get(self, field: str, default=None):
+        if field not in self._fields:
+            return default
+        value = getattr(self, field)
+        return default if value is None else value
+
+    def __getitem__(self, field: str):
+        value = getattr(self, field) if field in self._fields else None
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._fields and getattr(self, field) is not None
+
+    def to_dict(self) -> dict:
+        """The projected JSON form, as stored in the card index"""
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            if field == 'card_faces':
+                value = [face.to_dict() for face in value]
+            elif field in LIST_FIELDS:
+                value = list(value)
+            data[field] = value
+        return data
+
+
+class CardFace(_Record):
+    """One face of a multi-faced card"""
+
+    __slots__ = FACE_FIELDS + ('image_uris',)
+    _fields = frozenset(__slots__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CardFace':
+        face = cls.__new__(cls)
+        for field in FACE_FIELDS:
+            setattr(face, field, _value(field, data.get(field)))
+        face.image_uris = project_images(data.get('image_uris'))
+        return face
+
+
+class Card(_Record):
+    """A card projected down to the fields the bot uses"""
+
+    __slots__ = CARD_FIELDS + ('image_uris', 'card_faces', 'prices')
+    _fields = frozenset(__slots__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Card':
+        """Build from a full Scryfall card object or a projected one"""
+        card = cls.__new__(cls)
+        for field in CARD_FIELDS:
+            setattr(card, field, _value(field, data.get(field)))
+        card.image_uris = project_images(data.get('image_uris'))
+        faces = data.get('card_faces')
+        card.card_faces = tuple(CardFace.from_dict(face) for face in faces) if faces else None
+        prices = data.get('prices')
+        card.prices = {field: prices.get(field) for field in PRICE_FIELDS} if prices else None
+        return card
+
+    @classmethod
+    def from_json(cls, text) -> 'Card':
+        return cls.from_dict(json.loads(text))
+
+    def __repr__(self) -> str:
+        return f'<Card {self.name!r}>'
+
+
+def _measure(build, count: int):
+    """(bytes per entry, microseconds per entry) to build count entries"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    entries = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return current / count, elapsed / count * 1e6
+
+
+def benchmark(bulk_path: str, limit: int = 10000):
+    """Report per-card memory and deserialization time of raw dicts, projected dicts and Cards"""
+    from services.bulk_import import iter_json_array, project_card
+
+    with open(bulk_path, encoding='utf-8') as f:
+        raw_texts = []
+        projected_texts = []
+        for card in iter_json_array(f):
+            raw_texts.append(json.dumps(card))
+            projected_texts.append(json.dumps(project_card(card), separators=(',', ':')))
+            if len(raw_texts) == limit:
+                break
+    count = len(raw_texts)
+
+    results = [
+        ('Scryfall dict', _measure(lambda: [json.loads(text) for text in raw_texts], count)),
+        ('Projected dict', _measure(lambda: [json.loads(text) for text in projected_texts], count)),
+        ('Card', _measure(lambda: [Card.from_json(text) for text in projected_texts], count)),
+    ]
+
+    print(f'{count} cards from {bulk_path}')
+    raw_bytes = results[0][1][0]
+    for label, (per_entry, micros) in results:
+        print(f'{label:<15} {per_entry:>8.0f} bytes/card ({per_entry / raw_bytes:>4.0%})  {micros:>6.1f} µs/card')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python -m models.card <bulk.json> [count]')
+        sys.exit(1)
+    benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
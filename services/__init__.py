@@ -0,0 +1,20 @@
+# Services package
+from .bloom import BloomFilter
+from .cache import LRUCache, CardCache
+from .card_images import ImageCache
+from .card_index import CardIndex
+from .fuzzy import FuzzyMatcher
+from .http import HttpClient
+from .http_cache import HttpCache
+from .names import normalize_name
+from .oracle_index import OracleIndex
+from .popularity import PopularityTracker
+from .prefix_index import PrefixIndex
+from .price_history import PriceHistory, Watchlist
+from .scheduler import RequestScheduler, ScryfallError, INTERACTIVE, BACKGROUND
+from .similar import SimilarityIndex
+from .singleflight import SingleFlight
+from .symbols import ManaSymbols
+
+__all__ = ['BloomFilter', 'LRUCache', 'CardCache', 'CardIndex', 'FuzzyMatcher', 'HttpClient', 'HttpCache', 'ImageCache', 'ManaSymbols', 'normalize_name', 'OracleIndex', 'PopularityTracker', 'PrefixIndex', 'PriceHistory', 'RequestScheduler', 'ScryfallError',
+           'INTERACTIVE', 'BACKGROUND', 'SimilarityIndex', 'SingleFlight', 'Watchlist']
@@ -0,0 +1,178 @@
+"""Streaming importer for Scryfall bulk data files
+
+Bulk files are a single JSON array of 100 MB - 2 GB, so they are parsed one
+card at a time and written to the index in batched transactions. Peak memory
+is bounded by the read buffer, one batch of projected cards and the largest
+single card object, regardless of file size.
+
+Benchmark an import with:
+    python -m services.bulk_import data/oracle-cards.json
+"""
+import json
+import os
+import resource
+import sqlite3
+import sys
+import time
+from typing import IO, Iterator
+
+from models.card import CARD_FIELDS, FACE_FIELDS, PRICE_FIELDS, project_images
+
+from .card_index import SCHEMA, card_names
+
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 500
+
+
+def project_card(card: dict) -> dict:
+    """Keep only the fields of a Scryfall card object that the bot uses"""
+    projected = {field: card[field] for field in CARD_FIELDS if field in card}
+
+    images = project_images(card.get('image_uris'))
+    if images:
+        projected['image_uris'] = images
+
+    if card.get('card_faces'):
+        faces = []
+        for face in card['card_faces']:
+            projected_face = {field: face[field] for field in FACE_FIELDS if field in face}
+            face_images = project_images(face.get('image_uris'))
+            if face_images:
+                projected_face['image_uris'] = face_images
+            faces.append(projected_face)
+        projected['card_faces'] = faces
+
+    prices = card.get('prices')
+    if prices:
+        projected['prices'] = {field: prices.get(field) for field in PRICE_FIELDS}
+
+    return projected
+
+
+def iter_json_array(f: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Incrementally parse a top-level JSON array, yielding one element at a time"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace, the opening bracket and separators
+        while pos < len(buf) and buf[pos] in ' \t\r\n,[':
+            if buf[pos] == '[':
+                if started:
+                    break
+                started = True
+            pos += 1
+
+        if pos < len(buf) and buf[pos] == ']':
+            return
+
+        if pos < len(buf):
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element spans past the end of the buffer; read more below
+            else:
+                # A number ending at the buffer end may continue in the next chunk
+                if end < len(buf) or eof:
+                    yield item
+                    pos = end
+                    continue
+
+        if eof:
+            # Ran out of data before the closing bracket
+            raise ValueError('Unexpected end of bulk data file')
+
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _insert_batch(conn: sqlite3.Connection, batch: list):
+    conn.executemany(
+        'INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?)',
+        [
+            (card['id'], card.get('oracle_id'), card['name'], card.get('released_at'),
+             json.dumps(card, separators=(',', ':')))
+            for card in batch
+        ]
+    )
+    conn.executemany(
+        'INSERT OR IGNORE INTO names VALUES (?, ?, ?)',
+        [
+            (name, priority, card['id'])
+            for card in batch
+            for name, priority in card_names(card)
+            if name
+        ]
+    )
+    conn.commit()
+
+
+def build_index(bulk_path: str, db_path: str, source_updated_at: str = '',
+                batch_size: int = BATCH_SIZE) -> int:
+    """Build a fresh SQLite index at db_path from a Scryfall bulk JSON file
+
+    Runs synchronously; call it from a worker thread. Returns the card count.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        count = 0
+        batch = []
+        with open(bulk_path, encoding='utf-8') as f:
+            for card in iter_json_array(f):
+                if not card.get('id') or not card.get('name'):
+                    continue
+                batch.append(project_card(card))
+                if len(batch) >= batch_size:
+                    _insert_batch(conn, batch)
+                    count += len(batch)
+                    batch = []
+
+        if batch:
+            _insert_batch(conn, batch)
+            count += len(batch)
+
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('imported_at', str(time.time())),
+            ('source_updated_at', source_updated_at),
+            ('card_count', str(count)),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+
+    return count
+
+
+def benchmark(bulk_path: str, db_path: str):
+    """Import a bulk file and report throughput and peak memory"""
+    start = time.perf_counter()
+    count = build_index(bulk_path, db_path)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mib = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    size_mib = os.path.getsize(bulk_path) / (1024 * 1024)
+
+    print(f'Imported {count} cards from {size_mib:.0f} MiB in {elapsed:.1f}s')
+    print(f'Throughput: {count / elapsed:.0f} cards/sec')
+    print(f'Peak RSS: {peak_mib:.1f} MiB')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python -m services.bulk_import <bulk.json> [index.db]')
+        sys.exit(1)
+    benchmark(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else 'bulk_import_benchmark.db')
@@ -0,0 +1,220 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from models.card import Card
+
+from .names import normalize_name
+
+
+def _json_size(value) -> int:
+    """Approximate the memory held by a value from its JSON encoding"""
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+class LRUCache:
+    """Bounded LRU cache with per-entry TTL and an approximate memory cap"""
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = _json_size):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # {key: (expires_at, size, value)}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def get(self, key, default=None):
+        """Get a value, refreshing its recency. Expired entries count as misses."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry[0] <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def peek(self, key, default=None):
+        """Get a value without refreshing its recency or counting a hit"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return default
+        return entry[2]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """Insert or replace a value, evicting least recently used entries as needed"""
+        if key in self._entries:
+            self._remove(key)
+
+        size = self.sizeof(value) if self.max_bytes else 0
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, size, value)
+        self.bytes += size
+        self._evict()
+
+    def pop(self, key, default=None):
+        """Remove a value and return it"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry[2]
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        self._entries.clear()
+        self.bytes = 0
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def dump(self) -> list:
+        """Serialize live entries, least recently used first"""
+        now = time.time()
+        return [
+            [key, expires_at, value]
+            for key, (expires_at, _, value) in self._entries.items()
+            if expires_at > now
+        ]
+
+    def restore(self, entries: list):
+        """Load entries produced by dump(), keeping their original expiry"""
+        now = time.time()
+        for key, expires_at, value in entries:
+            if expires_at > now:
+                self.set(key, value, ttl=expires_at - now)
+
+
+class CardCache:
+    """Card lookup cache keyed on resolved card id, with query aliases
+
+    Cards are stored once by Scryfall id. Normalized queries and card names
+    map to that id, so "sol ring", "Sol Ring" and the typo that resolved to
+    it all share one entry. Cards are kept as compact Card objects.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: Optional[int] = None):
+        self.cards = LRUCache(max_entries, ttl, max_bytes=max_bytes, sizeof=lambda card: _json_size(card.to_dict()))
+        self.aliases = LRUCache(max_entries * 4, ttl, sizeof=lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+
+    def get_by_name(self, query: str) -> Optional[Card]:
+        key = normalize_name(query)
+        card_id = self.aliases.get(key)
+        card = self.cards.get(card_id) if card_id is not None else None
+        if card is None:
+            if card_id is not None:
+                self.aliases.pop(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return card
+
+    def peek(self, query: str) -> Optional[Card]:
+        """The card cached under a query or name, without counting a lookup or refreshing it"""
+        card_id = self.aliases.peek(normalize_name(query))
+        return self.cards.peek(card_id) if card_id is not None else None
+
+    def get_by_id(self, card_id: str) -> Optional[Card]:
+        card = self.cards.get(card_id)
+        if card is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return card
+
+    def put(self, card, query: Optional[str] = None):
+        """Store a card (a Card or Scryfall dict) under its id and alias it to its name and the query used"""
+        if not isinstance(card, Card):
+            card = Card.from_dict(card)
+        card_id = card.get('id')
+        if not card_id:
+            return
+
+        self.cards.set(card_id, card)
+        self.aliases.set(normalize_name(card.get('name', '')), card_id)
+        if query:
+            self.aliases.set(normalize_name(query), card_id)
+
+    def clear(self):
+        self.cards.clear()
+        self.aliases.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        stats = self.cards.stats
+        stats['aliases'] = len(self.aliases)
+        stats['hits'] = self.hits
+        stats['misses'] = self.misses
+        return stats
+
+    def save(self, path: str):
+        """Write a snapshot of the cache to disk atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        cards = [[key, expires_at, card.to_dict()] for key, expires_at, card in self.cards.dump()]
+        snapshot = {'cards': cards, 'aliases': self.aliases.dump()}
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """Load a snapshot written by save(). Returns the number of cards restored."""
+        if not os.path.exists(path):
+            return 0
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading card cache snapshot: {e}")
+            return 0
+
+        self.cards.restore(
+            [key, expires_at, Card.from_dict(card)] for key, expires_at, card in snapshot.get('cards', [])
+        )
+        self.aliases.restore(snapshot.get('aliases', []))
+        return len(self.cards)
@@ -0,0 +1,132 @@
+"""Side-by-side images of double-faced cards, kept in a size-bounded directory
+
+Each composite is one JPEG named after the card id. Recency is tracked in
+memory and persisted through file modification times (a hit touches the
+file), so the order survives restarts. When the directory grows past its
+size budget the least recently used files are deleted.
+"""
+import io
+import os
+from collections import OrderedDict
+from typing import List, Optional
+
+from PIL import Image
+
+FACE_GAP = 8  # Pixels between faces
+JPEG_QUALITY = 88
+EVICT_TO = 0.9  # Evict down to this share of the budget so the next few writes don't evict again
+
+
+def face_image_urls(card: dict, size: str = 'normal') -> List[str]:
+    """Image URLs of each face of a card whose faces are printed separately, else []"""
+    if card.get('image_uris'):
+        return []  # Split, flip and adventure cards show every face in one image
+    urls = [(face.get('image_uris') or {}).get(size) for face in card.get('card_faces') or []]
+    return urls if len(urls) >= 2 and all(urls) else []
+
+
+def compose_faces(images: List[bytes]) -> bytes:
+    """Place face images side by side at a common height. CPU bound; run it in a thread."""
+    faces = [Image.open(io.BytesIO(data)).convert('RGB') for data in images]
+    height = min(face.height for face in faces)
+    faces = [
+        face if face.height == height else face.resize((round(face.width * height / face.height), height))
+        for face in faces
+    ]
+
+    width = sum(face.width for face in faces) + FACE_GAP * (len(faces) - 1)
+    composite = Image.new('RGB', (width, height), (255, 255, 255))
+    x = 0
+    for face in faces:
+        composite.paste(face, (x, 0))
+        x += face.width + FACE_GAP
+
+    out = io.BytesIO()
+    composite.save(out, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+class ImageCache:
+    """On-disk LRU of composite card images keyed by card id"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # {card id: file size}, least recent first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._sizes
+
+    def open(self):
+        """Index the files already on disk"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.jpg'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        files.sort()
+        self._sizes = OrderedDict((card_id, size) for _, card_id, size in files)
+        self.bytes = sum(self._sizes.values())
+
+    def path(self, card_id: str) -> str:
+        return os.path.join(self.directory, f'{card_id}.jpg')
+
+    def get(self, card_id: str) -> Optional[str]:
+        """Path of a cached composite, marking it recently used"""
+        if card_id not in self._sizes:
+            self.misses += 1
+            return None
+
+        path = self.path(card_id)
+        try:
+            os.utime(path)
+        except OSError:
+            self.bytes -= self._sizes.pop(card_id)
+            self.misses += 1
+            return None
+        self._sizes.move_to_end(card_id)
+        self.hits += 1
+        return path
+
+    def put(self, card_id: str, data: bytes) -> str:
+        """Store a composite and evict least recently used files beyond the size budget"""
+        path = self.path(card_id)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self.bytes += len(data) - self._sizes.pop(card_id, 0)
+        self._sizes[card_id] = len(data)
+        if self.bytes > self.max_bytes:
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Never evict the newest entry, which was just written for a caller
+        while len(self._sizes) > 1 and self.bytes > self.max_bytes * EVICT_TO:
+            card_id, size = self._sizes.popitem(last=False)
+            try:
+                os.remove(self.path(card_id))
+            except OSError:
+                pass
+            self.bytes -= size
+            self.evictions += 1
+
+    @property
+    def stats(self):
+        return {
+            'entries': len(self._sizes),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,166 @@
+import json
+import os
+import sqlite3
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+from models.card import Card
+
+from .names import normalize_name
+from .scheduler import BACKGROUND, RequestScheduler
+
+SCHEMA = """
+CREATE TABLE cards (
+    id TEXT PRIMARY KEY,
+    oracle_id TEXT,
+    name TEXT NOT NULL,
+    released_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE names (
+    norm_name TEXT NOT NULL,
+    priority INTEGER NOT NULL,  -- 0 = full card name, 1 = face name
+    card_id TEXT NOT NULL,
+    PRIMARY KEY (norm_name, priority, card_id)
+) WITHOUT ROWID;
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def card_names(card: dict) -> Iterable[tuple]:
+    """Yield (normalized name, priority) pairs a card can be looked up by"""
+    yield normalize_name(card.get('name', '')), 0
+    for face in card.get('card_faces') or []:
+        face_name = normalize_name(face.get('name', ''))
+        if face_name:
+            yield face_name, 1
+
+
+async def fetch_bulk_info(scheduler: RequestScheduler, api_base: str,
+                          bulk_type: str) -> Optional[dict]:
+    """Get the Scryfall bulk data object (download_uri, updated_at, ...) for a bulk type"""
+    response = await scheduler.get(f'{api_base}/bulk-data/{bulk_type}', priority=BACKGROUND, cache=False)
+    if response.status != 200:
+        print(f"Error fetching bulk data info: HTTP {response.status}")
+        return None
+    return response.json()
+
+
+async def download_bulk_data(session: aiohttp.ClientSession, url: str, dest: str,
+                             chunk_size: int = 1 << 16) -> bool:
+    """Stream a Scryfall bulk data file to dest without holding it in memory"""
+    tmp_path = f'{dest}.tmp'
+    # Bulk files take minutes on slow links; only time out if the stream stalls
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+    async with session.get(url, timeout=timeout) as response:
+        if response.status != 200:
+            print(f"Error downloading bulk data: HTTP {response.status}")
+            return False
+        with open(tmp_path, 'wb') as f:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                f.write(chunk)
+
+    os.replace(tmp_path, dest)
+    return True
+
+
+def iter_index_cards(path: str) -> Iterator[dict]:
+    """Yield every card in an index file, in a stable order"""
+    if not os.path.exists(path):
+        return
+
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        for (data,) in conn.execute('SELECT data FROM cards ORDER BY rowid'):
+            yield json.loads(data)
+    finally:
+        conn.close()
+
+
+class CardIndex:
+    """Read-only view over the local SQLite card index
+
+    The index file is replaced atomically by swap(), so lookups never see a
+    half-built index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.imported_at: Optional[float] = None
+        self.source_updated_at = ''
+        self.card_count = 0
+
+    @property
+    def available(self) -> bool:
+        return self.conn is not None
+
+    def open(self) -> bool:
+        """Open the index if it exists. Returns True if it is usable."""
+        self.close()
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            self.conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+        except sqlite3.Error as e:
+            print(f"Error opening card index: {e}")
+            self.close()
+            return False
+
+        self.imported_at = float(meta.get('imported_at') or 0)
+        self.source_updated_at = meta.get('source_updated_at', '')
+        self.card_count = int(meta.get('card_count') or 0)
+        return True
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def swap(self, new_path: str) -> bool:
+        """Atomically replace the index file with a freshly built one and reopen it"""
+        self.close()
+        os.replace(new_path, self.path)
+        return self.open()
+
+    def get_by_name(self, name: str) -> Optional[Card]:
+        """Look up a card by exact (normalized) card or face name"""
+        if not self.conn:
+            return None
+
+        row = self.conn.execute(
+            'SELECT c.data FROM names n JOIN cards c ON c.id = n.card_id '
+            'WHERE n.norm_name = ? ORDER BY n.priority LIMIT 1',
+            (normalize_name(name),)
+        ).fetchone()
+        return Card.from_json(row[0]) if row else None
+
+    def names(self) -> List[Tuple[str, str]]:
+        """Return every (normalized lookup name, card name) pair, full names first"""
+        if not self.conn:
+            return []
+
+        return self.conn.execute(
+            'SELECT n.norm_name, c.name FROM names n JOIN cards c ON c.id = n.card_id '
+            'ORDER BY n.priority'
+        ).fetchall()
+
+    def iter_cards(self) -> Iterator[dict]:
+        """Yield every card in the index
+
+        Uses its own connection, so it is safe to call from a worker thread.
+        """
+        return iter_index_cards(self.path)
+
+    def get_by_id(self, card_id: str) -> Optional[Card]:
+        if not self.conn:
+            return None
+
+        row = self.conn.execute('SELECT data FROM cards WHERE id = ?', (card_id,)).fetchone()
+        return Card.from_json(row[0]) if row else None
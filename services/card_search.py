@@ -0,0 +1,293 @@
+"""Local Scryfall-syntax card search over a columnar card table
+
+Supported terms (all terms must match; prefix a term with - to negate it):
+    c: / color:         colors, e.g. c:ug, c=r, c<=wubrg, c:c (colorless), c:m (multicolor)
+    id: / identity:     color identity; id:ug means "fits in a Simic deck"
+    t: / type:          type line words, e.g. t:legendary t:creature t:elf
+    o: / oracle:        oracle text contains, e.g. o:"draw a card"
+    cmc / mv, pow / power, tou / toughness, loy / loyalty with : = != < <= > >=
+    r: / rarity:        common, uncommon, rare, mythic (comparisons allowed)
+    bare words          card name contains
+
+Random picks (CardTable.sample) also accept bare type words, e.g. "legendary creature c:g".
+"""
+import random
+import re
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+COLOR_ORDER = 'WUBRG'
+COLOR_BITS = {color: 1 << i for i, color in enumerate(COLOR_ORDER)}
+COLOR_NAMES = {
+    'white': 'w', 'blue': 'u', 'black': 'b', 'red': 'r', 'green': 'g',
+    'azorius': 'wu', 'dimir': 'ub', 'rakdos': 'br', 'gruul': 'rg', 'selesnya': 'gw',
+    'orzhov': 'wb', 'izzet': 'ur', 'golgari': 'bg', 'boros': 'rw', 'simic': 'gu',
+    'bant': 'gwu', 'esper': 'wub', 'grixis': 'ubr', 'jund': 'brg', 'naya': 'rgw',
+    'abzan': 'wbg', 'jeskai': 'urw', 'sultai': 'bgu', 'mardu': 'rwb', 'temur': 'gur',
+}
+POPCOUNT = np.array([bin(i).count('1') for i in range(32)], dtype=np.uint8)
+
+# Card types and supertypes get a bit each; other type line words use a text scan
+TYPE_WORDS = (
+    'artifact', 'battle', 'creature', 'enchantment', 'instant', 'land', 'planeswalker',
+    'sorcery', 'tribal', 'kindred', 'legendary', 'basic', 'snow', 'world',
+)
+TYPE_BITS = {word: 1 << i for i, word in enumerate(TYPE_WORDS)}
+
+RARITIES = ('common', 'uncommon', 'rare', 'mythic', 'special', 'bonus')
+RARITY_ALIASES = {'c': 'common', 'u': 'uncommon', 'r': 'rare', 'm': 'mythic', 's': 'special'}
+
+KEY_ALIASES = {
+    'c': 'color', 'color': 'color', 'colors': 'color',
+    'id': 'identity', 'ci': 'identity', 'identity': 'identity',
+    't': 'type', 'type': 'type',
+    'o': 'oracle', 'oracle': 'oracle',
+    'cmc': 'cmc', 'mv': 'cmc', 'manavalue': 'cmc',
+    'pow': 'power', 'power': 'power',
+    'tou': 'toughness', 'toughness': 'toughness',
+    'loy': 'loyalty', 'loyalty': 'loyalty',
+    'r': 'rarity', 'rarity': 'rarity',
+}
+# Filters whose matching rows are precomputed so a random pick never scans the table
+RANDOM_FILTERS = ('',) + tuple(f't:{word}' for word in TYPE_WORDS) + tuple(f'c:{color}' for color in 'wubrgcm')
+RANDOM_CACHE_SIZE = 256  # Other filters, cached after first use
+
+TOKEN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+TERM = re.compile(r'^(-?)([a-z]+)(:|!=|<=|>=|=|<|>)(.+)$')
+
+
+class SearchError(ValueError):
+    """Raised for queries the local search engine can't parse"""
+
+
+def color_mask(value: str) -> int:
+    """Turn a color string such as "ug", "wubrg" or "simic" into a bitmask"""
+    value = COLOR_NAMES.get(value.lower(), value.lower())
+    mask = 0
+    for letter in value:
+        bit = COLOR_BITS.get(letter.upper())
+        if bit is None:
+            raise SearchError(f'Unknown color: {value}')
+        mask |= bit
+    return mask
+
+
+def random_filter_key(query: str) -> str:
+    """Canonical form of a random filter: bare type words become t: terms, order doesn't matter"""
+    if query.count('"') % 2:
+        raise SearchError('Unbalanced quotes in query')
+
+    tokens = []
+    for token in TOKEN.findall(query.lower()):
+        bare = token.lstrip('-')
+        if bare in TYPE_BITS:
+            token = token[:len(token) - len(bare)] + 't:' + bare
+        tokens.append(token)
+    return ' '.join(sorted(tokens))
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _face_values(card: dict, field: str) -> list:
+    faces = card.get('card_faces') or []
+    return [face[field] for face in faces if face.get(field)]
+
+
+class CardTable:
+    """Columnar view of every card in the local index for vectorized filtering"""
+
+    def __init__(self, cards: Iterable[dict] = ()):
+        ids, names, type_lines, oracle_texts = [], [], [], []
+        colors, identity, cmc, power, toughness, loyalty, types, rarity = [], [], [], [], [], [], [], []
+
+        for card in cards:
+            ids.append(card['id'])
+            names.append(card['name'])
+            type_line = card.get('type_line', '')
+            type_lines.append(type_line)
+            oracle_texts.append(
+                (card.get('oracle_text') or '\n'.join(_face_values(card, 'oracle_text'))).lower()
+            )
+
+            card_colors = card.get('colors')
+            if card_colors is None:
+                card_colors = [color for face in _face_values(card, 'colors') for color in face]
+            colors.append(sum(COLOR_BITS.get(color, 0) for color in set(card_colors)))
+            identity.append(sum(COLOR_BITS.get(color, 0) for color in card.get('color_identity', [])))
+
+            cmc.append(_number(card.get('cmc')))
+            power.append(_number(card.get('power', (_face_values(card, 'power') or [None])[0])))
+            toughness.append(_number(card.get('toughness', (_face_values(card, 'toughness') or [None])[0])))
+            loyalty.append(_number(card.get('loyalty', (_face_values(card, 'loyalty') or [None])[0])))
+
+            bits = 0
+            for word in type_line.lower().replace('—', ' ').split():
+                bits |= TYPE_BITS.get(word, 0)
+            types.append(bits)
+
+            card_rarity = card.get('rarity', '')
+            rarity.append(RARITIES.index(card_rarity) if card_rarity in RARITIES else len(RARITIES))
+
+        self.ids: List[str] = ids
+        self.names: List[str] = names
+        self.type_lines: List[str] = type_lines
+        self._type_lines_lower = [type_line.lower() for type_line in type_lines]
+        self._names_lower = [name.lower() for name in names]
+        self._oracle_texts = oracle_texts
+        self.colors = np.array(colors, dtype=np.uint8)
+        self.identity = np.array(identity, dtype=np.uint8)
+        self.cmc = np.array(cmc, dtype=np.float32)
+        self.power = np.array(power, dtype=np.float32)
+        self.toughness = np.array(toughness, dtype=np.float32)
+        self.loyalty = np.array(loyalty, dtype=np.float32)
+        self.types = np.array(types, dtype=np.uint32)
+        self.rarity = np.array(rarity, dtype=np.uint8)
+        self.by_name = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64)
+
+        self._random_rows = {key: np.flatnonzero(self.mask(key)) for key in RANDOM_FILTERS}
+        self._random_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str) -> np.ndarray:
+        """Return the row numbers of cards matching a query, sorted by name"""
+        return self.by_name[self.mask(query)[self.by_name]]
+
+    def sample(self, query: str = '') -> Optional[int]:
+        """Pick a uniformly random row matching a query, or None if nothing matches"""
+        rows = self.random_rows(query)
+        if not len(rows):
+            return None
+        return int(rows[random.randrange(len(rows))])
+
+    def random_rows(self, query: str) -> np.ndarray:
+        """Row numbers matching a random filter, computed once per distinct filter"""
+        key = random_filter_key(query)
+        rows = self._random_rows.get(key)
+        if rows is not None:
+            return rows
+
+        rows = self._random_cache.get(key)
+        if rows is not None:
+            self._random_cache.move_to_end(key)
+            return rows
+
+        rows = np.flatnonzero(self.mask(key))
+        self._random_cache[key] = rows
+        if len(self._random_cache) > RANDOM_CACHE_SIZE:
+            self._random_cache.popitem(last=False)
+        return rows
+
+    def mask(self, query: str) -> np.ndarray:
+        """Evaluate a query to a boolean mask over all cards"""
+        if query.count('"') % 2:
+            raise SearchError('Unbalanced quotes in query')
+
+        tokens = [token.replace('"', '') for token in TOKEN.findall(query)]
+        mask = np.ones(len(self.ids), dtype=bool)
+        for token in tokens:
+            mask &= self._term_mask(token)
+        return mask
+
+    def _term_mask(self, token: str) -> np.ndarray:
+        match = TERM.match(token.lower())
+        if match and match.group(2) not in KEY_ALIASES:
+            # e.g. set:, is:, f:, usd>; left to Scryfall rather than read as name text
+            raise SearchError(f'Unsupported search key: {match.group(2)}')
+        if not match:
+            negate = token.startswith('-') and len(token) > 1
+            word = token[1:] if negate else token
+            term = self._text_mask(self._names_lower, word.lower())
+            return ~term if negate else term
+
+        negate, key, op, value = match.groups()
+        key = KEY_ALIASES[key]
+
+        if key in ('color', 'identity'):
+            term = self._color_mask(key, op, value)
+        elif key == 'type':
+            term = self._type_mask(value)
+        elif key == 'oracle':
+            term = self._text_mask(self._oracle_texts, value)
+        elif key == 'rarity':
+            rarity = RARITY_ALIASES.get(value, value)
+            if rarity not in RARITIES:
+                raise SearchError(f'Unknown rarity: {value}')
+            term = self._compare(self.rarity, op, RARITIES.index(rarity))
+        else:
+            number = _number(value)
+            if np.isnan(number):
+                raise SearchError(f'Expected a number for {key}: {value}')
+            term = self._compare(getattr(self, key), op, number)
+
+        return ~term if negate else term
+
+    def _color_mask(self, key: str, op: str, value: str) -> np.ndarray:
+        column = self.colors if key == 'color' else self.identity
+        value = value.lower()
+
+        if value in ('c', 'colorless'):
+            target = 0
+        elif value in ('m', 'multicolor'):
+            count = POPCOUNT[column]
+            return count >= 2 if op == ':' else self._compare(count, op, 2)
+        else:
+            target = color_mask(value)
+
+        # Scryfall reads "c:" as "at least these colors" and "id:" as "fits within these colors"
+        if op == ':':
+            op = '>=' if key == 'color' else '<='
+        if target == 0 and op == '>=':
+            op = '='
+
+        subset = (column & ~np.uint8(target)) == 0  # card colors within target
+        superset = (column & np.uint8(target)) == target  # card has all target colors
+        equal = column == target
+        if op == '=':
+            return equal
+        if op == '!=':
+            return ~equal
+        if op == '<=':
+            return subset
+        if op == '<':
+            return subset & ~equal
+        if op == '>=':
+            return superset
+        return superset & ~equal
+
+    def _type_mask(self, value: str) -> np.ndarray:
+        value = value.lower()
+        bit = TYPE_BITS.get(value)
+        if bit is not None:
+            return (self.types & np.uint32(bit)) != 0
+        return self._text_mask(self._type_lines_lower, value)
+
+    @staticmethod
+    def _text_mask(texts: List[str], value: str) -> np.ndarray:
+        return np.fromiter((value in text for text in texts), dtype=bool, count=len(texts))
+
+    @staticmethod
+    def _compare(column: np.ndarray, op: str, value) -> np.ndarray:
+        if op in (':', '='):
+            return column == value
+        if op == '!=':
+            return column != value
+        if op == '<':
+            return column < value
+        if op == '<=':
+            return column <= value
+        if op == '>':
+            return column > value
+        return column >= value
+
+    def row(self, row: int) -> dict:
+        """Basic display fields for a result row"""
+        return {'id': self.ids[row], 'name': self.names[row], 'type_line': self.type_lines[row]}
@@ -0,0 +1,152 @@
+"""Decklist parsing and analysis for Moxfield / Archidekt / MTGO text exports"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .card_search import COLOR_ORDER
+from .names import normalize_name
+
+LINE = re.compile(
+    r'^(?:(?P<quantity>\d+)\s*x?\s+)?'  # 1 / 1x
+    r'(?P<name>.+?)'
+    r'(?:\s+\((?P<set>[A-Za-z0-9]{2,6})\)(?:\s+[A-Za-z0-9\-★]+)?)?'  # (CMR) 472
+    r'(?:\s+\*[A-Za-z]+\*)*'  # *F* foil / *E* etched markers
+    r'(?:\s+\[(?P<tags>[^\]]*)\])?'  # Archidekt [Commander{top}] tags
+    r'(?:\s+\^[^^]*\^)?\s*$'  # Archidekt ^color tag^
+)
+SECTIONS = {
+    'commander': 'commander', 'commanders': 'commander',
+    'deck': 'main', 'main': 'main', 'mainboard': 'main', 'companion': 'main',
+    'sideboard': 'skip', 'maybeboard': 'skip', 'considering': 'skip', 'tokens': 'skip',
+}
+SYMBOL = re.compile(r'\{([^}]+)\}')
+CURVE_MAX = 7  # Mana values of 7 and up share one bucket
+
+
+class Decklist:
+    """A parsed decklist: commanders plus (quantity, name) entries"""
+
+    def __init__(self):
+        self.commanders: List[str] = []
+        self.entries: List[Tuple[int, str]] = []  # main deck, not including commanders
+
+    @property
+    def names(self) -> List[str]:
+        """Every distinct card name, commanders first"""
+        seen = set()
+        names = []
+        for name in self.commanders + [name for _, name in self.entries]:
+            key = normalize_name(name)
+            if key not in seen:
+                seen.add(key)
+                names.append(name)
+        return names
+
+    @property
+    def card_count(self) -> int:
+        return len(self.commanders) + sum(quantity for quantity, _ in self.entries)
+
+
+def _section_header(line: str) -> Optional[str]:
+    header = line.strip('/ :').lower()
+    return SECTIONS.get(header)
+
+
+def parse_decklist(text: str) -> Decklist:
+    """Parse a text export. Unknown lines are skipped rather than rejected."""
+    deck = Decklist()
+    section = 'main'
+    for raw_line in text.replace('```', '\n').splitlines():
+        line = raw_line.strip()
+        if not line:
+            # A blank line closes a commander section that has no following header
+            if section == 'commander' and deck.commanders:
+                section = 'main'
+            continue
+
+        header = _section_header(line)
+        if header:
+            section = header
+            continue
+        if line.startswith('//') or line.startswith('#') or section == 'skip':
+            continue
+
+        match = LINE.match(line)
+        if not match:
+            continue
+
+        quantity = int(match.group('quantity') or 1)
+        name = match.group('name').strip()
+        tags = (match.group('tags') or '').lower()
+        if section == 'commander' or 'commander' in tags:
+            deck.commanders.append(name)
+        elif 'sideboard' in tags or 'maybeboard' in tags:
+            continue
+        else:
+            deck.entries.append((quantity, name))
+
+    return deck
+
+
+def mana_costs(card: dict) -> List[str]:
+    if card.get('mana_cost'):
+        return [card['mana_cost']]
+    return [face.get('mana_cost', '') for face in card.get('card_faces') or []]
+
+
+def is_land(card: dict) -> bool:
+    return 'Land' in card.get('type_line', '').split(' // ')[0]
+
+
+class DeckAnalysis:
+    """Mana curve, color pips, identity legality and price of a resolved deck"""
+
+    def __init__(self, deck: Decklist, cards: Dict[str, dict], prices: Dict[str, Optional[float]]):
+        """cards and prices are keyed by normalized name as written in the decklist"""
+        self.curve = Counter()
+        self.pips = Counter()
+        self.lands = 0
+        self.total_price = 0.0
+        self.unpriced: List[str] = []
+        self.not_found: List[str] = []
+        self.outside_identity: List[str] = []
+
+        self.identity = set()
+        commanders = []
+        for name in deck.commanders:
+            card = cards.get(normalize_name(name))
+            if card:
+                commanders.append(card)
+                self.identity.update(card.get('color_identity', []))
+        self.commander_names = [card['name'] for card in commanders]
+
+        for quantity, name in [(1, name) for name in deck.commanders] + deck.entries:
+            key = normalize_name(name)
+            card = cards.get(key)
+            if not card:
+                self.not_found.append(name)
+                continue
+
+            if is_land(card):
+                self.lands += quantity
+            else:
+                self.curve[min(int(card.get('cmc') or 0), CURVE_MAX)] += quantity
+
+            for cost in mana_costs(card):
+                for symbol in SYMBOL.findall(cost):
+                    for color in COLOR_ORDER:
+                        if color in symbol:
+                            self.pips[color] += quantity
+
+            if commanders and not set(card.get('color_identity', [])) <= self.identity:
+                self.outside_identity.append(card['name'])
+
+            price = prices.get(key)
+            if price is None:
+                self.unpriced.append(card['name'])
+            else:
+                self.total_price += price * quantity
+
+    @property
+    def identity_string(self) -> str:
+        return ''.join(color for color in COLOR_ORDER if color in self.identity) or 'C'
@@ -0,0 +1,143 @@
+from array import array
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .names import normalize_name
+
+MATCH_THRESHOLD = 0.7  # Minimum similarity to answer with a card instead of suggestions
+MATCH_MARGIN = 0.05  # ...and by how much it must beat the runner-up
+MAX_SCANNED = 3000  # Posting entries counted for candidates per query, rarest trigrams first
+MAX_CANDIDATES = 40
+MAX_RERANKED = 8  # Top candidates re-scored with an edit-based ratio
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f'  {key} '
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class FuzzyMatcher:
+    """Local typo-tolerant card name matcher over a trigram index
+
+    Every full card name and every face name of split, adventure and
+    double-faced cards is indexed, and all of them resolve to the full card
+    name, so "ice", "fire ice" and "Fire // Ice" find the same card.
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []  # normalized names
+        self.targets: List[str] = []  # card name each key resolves to
+        self.exact: Dict[str, int] = {}  # {normalized name: key index}
+        self.postings: Dict[str, np.ndarray] = {}  # {trigram: sorted key indices}
+        self.gram_counts = np.zeros(0, dtype=np.uint16)  # distinct trigrams per key
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, names: Iterable[Tuple[str, str]]) -> 'FuzzyMatcher':
+        """Build a matcher from (name to match, card name) pairs"""
+        matcher = cls()
+        postings: Dict[str, array] = {}
+        gram_counts = array('H')
+        for name, target in names:
+            key = normalize_name(name)
+            if not key or key in matcher.exact:
+                continue
+            index = len(matcher.keys)
+            matcher.keys.append(key)
+            matcher.targets.append(target)
+            matcher.exact[key] = index
+            grams = set(trigrams(key))
+            gram_counts.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                postings.setdefault(gram, array('I')).append(index)
+        matcher.postings = {gram: np.frombuffer(indices, dtype=np.uint32) for gram, indices in postings.items()}
+        matcher.gram_counts = np.frombuffer(gram_counts, dtype=np.uint16)
+        return matcher
+
+    def rank(self, query: str) -> List[Tuple[str, float, float]]:
+        """(card name, score, similarity) for likely matches, best first
+
+        score includes how much of the query a name contains, so partial
+        names rank their cards first; similarity only counts whole-name
+        likeness and decides whether a match can be trusted outright.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        if key in self.exact:
+            return [(self.targets[self.exact[key]], 1.0, 1.0)]
+
+        query_grams = set(trigrams(key))
+        lists = sorted((self.postings[gram] for gram in query_grams if gram in self.postings), key=len)
+        if not lists:
+            return []
+
+        # Candidates come from the rarest trigrams, within a fixed budget of
+        # posting entries; common trigrams ("the", " of") only add to the
+        # shared counts of those candidates
+        scanned = np.cumsum([len(postings) for postings in lists])
+        used = max(1, int(np.searchsorted(scanned, MAX_SCANNED, side='right')))
+        counts = np.bincount(np.concatenate(lists[:used]))
+        candidates = np.flatnonzero(counts)
+        if len(candidates) > MAX_CANDIDATES:
+            candidates = candidates[np.argpartition(counts[candidates], -MAX_CANDIDATES)[-MAX_CANDIDATES:]]
+        shared = counts[candidates]
+        for postings in lists[used:]:
+            positions = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            shared = shared + (postings[positions] == candidates)
+
+        dice = 2 * shared / (len(query_grams) + self.gram_counts[candidates])
+        # Partial names ("rhystic") score on how much of the query the name contains
+        containment = shared / len(query_grams) * 0.9
+        scores = np.maximum(dice, containment)
+        order = sorted(
+            range(len(candidates)),
+            key=lambda i: (scores[i], dice[i], -len(self.keys[candidates[i]])),
+            reverse=True
+        )
+
+        # Trigrams punish transpositions ("sol rign") harder than an edit ratio does
+        sequence = SequenceMatcher(b=key, autojunk=False)
+        best: Dict[str, Tuple[float, float]] = {}
+        for rank, i in enumerate(order):
+            index, score, similarity = int(candidates[i]), float(scores[i]), float(dice[i])
+            if rank < MAX_RERANKED:
+                sequence.set_seq1(self.keys[index])
+                # The full ratio is slow; only compute it when it could make a match trustworthy
+                bound = sequence.quick_ratio()
+                if bound >= MATCH_THRESHOLD and bound > similarity:
+                    ratio = sequence.ratio()
+                    score, similarity = max(score, ratio), max(similarity, ratio)
+
+            target = self.targets[index]
+            if (score, similarity) > best.get(target, (0, 0)):
+                best[target] = (score, similarity)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], -len(item[0])), reverse=True)
+        return [(target, score, similarity) for target, (score, similarity) in ranked]
+
+    def match(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to limit (card name, score) pairs, best first. Scores are 0-1."""
+        return [(target, score) for target, score, _ in self.rank(query)[:limit]]
+
+    def best(self, query: str):
+        """Return the matching card name if the match is close and unambiguous, else None
+
+        Containing the query isn't enough: "bolt" or "elves" must be close to
+        a whole card name and clearly ahead of the runner-up, otherwise
+        callers show suggestions instead.
+        """
+        ranked = self.rank(query)
+        if not ranked:
+            return None
+
+        target, _, similarity = ranked[0]
+        runner_up = max((score for _, score, _ in ranked[1:]), default=0)
+        if similarity >= MATCH_THRESHOLD and similarity - runner_up >= MATCH_MARGIN:
+            return target
+        return None
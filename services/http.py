@@ -0,0 +1,136 @@
+import re
+import time
+from bisect import bisect_left
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import aiohttp
+
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+ID_SEGMENT = re.compile(r'^(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)$', re.I)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # last bucket is overflow
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given percentile"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    @property
+    def average_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+def endpoint_name(method: str, url) -> str:
+    """Group requests by endpoint: API paths with ids collapsed, other hosts by host"""
+    host = url.host or ''
+    if not host.startswith('api.'):
+        return f'{method} {host}'
+    path = '/'.join(':id' if ID_SEGMENT.match(segment) else segment for segment in url.path.split('/'))
+    return f'{method} {host}{path}'
+
+
+class HttpClient:
+    """Bot-wide async HTTP client
+
+    One tuned connection pool shared by every cog (bot.http_client), with
+    consistent timeouts and default headers. Every request made through the
+    session is timed into a per-endpoint latency histogram.
+    """
+
+    def __init__(self, user_agent: str, limit: int = 32, limit_per_host: int = 8,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 60,
+                 total_timeout: float = 30, connect_timeout: float = 10):
+        self.user_agent = user_agent
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    async def start(self):
+        """Create the shared session (needs a running event loop)"""
+        if self.session and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={'User-Agent': self.user_agent, 'Accept': 'application/json;q=0.9,*/*;q=0.8'},
+            trace_configs=[trace],
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _histogram(self, method: str, url) -> LatencyHistogram:
+        name = endpoint_name(method, url)
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params):
+        context.started = time.perf_counter()
+
+    async def _on_request_end(self, session, context: SimpleNamespace, params):
+        # Time to response headers; streamed bodies (bulk downloads) are not included
+        latency_ms = (time.perf_counter() - context.started) * 1000
+        self._histogram(params.method, params.url).record(latency_ms)
+
+    async def _on_request_exception(self, session, context: SimpleNamespace, params):
+        self._histogram(params.method, params.url).errors += 1
+
+    def stats(self) -> List[dict]:
+        """Per-endpoint latency summaries, busiest first"""
+        return [
+            {
+                'endpoint': name,
+                'count': histogram.count,
+                'errors': histogram.errors,
+                'avg_ms': histogram.average_ms,
+                'p50_ms': histogram.percentile(0.5),
+                'p95_ms': histogram.percentile(0.95),
+                'max_ms': histogram.max_ms,
+            }
+            for name, histogram in sorted(
+                self.histograms.items(), key=lambda item: item[1].count, reverse=True
+            )
+        ]
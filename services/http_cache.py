@@ -0,0 +1,243 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from .scheduler import BACKGROUND, INTERACTIVE, Response, ScryfallError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    max_age REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+KEPT_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+ACCESS_FLUSH_SIZE = 100  # Reads whose recency is written to disk in one batch
+ACCESS_FLUSH_INTERVAL = 60  # ...or after this many seconds, whichever comes first
+MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    if not params:
+        return url
+    return f'{url}?{urlencode(sorted(params.items()))}'
+
+
+class CachedEntry:
+    __slots__ = ('status', 'headers', 'body', 'stored_at', 'max_age')
+
+    def __init__(self, status, headers, body, stored_at, max_age):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.max_age = max_age
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def response(self, state: str) -> Response:
+        return Response(self.status, {**self.headers, 'X-Cache': state}, self.body)
+
+
+class HttpCache:
+    """Persistent HTTP response cache with revalidation and stale-while-revalidate
+
+    Successful GET responses are stored compressed in SQLite with their ETag
+    and Last-Modified validators. Fresh entries are served directly. Stale
+    entries inside the stale window are served immediately while a
+    background conditional request refreshes them. If Scryfall is
+    unreachable, any stored entry is served regardless of age. Total size is
+    bounded by evicting the least recently used entries.
+
+    Reads don't write to disk: their access times are collected in memory
+    and written in batches, before any eviction and on close.
+    """
+
+    def __init__(self, path: str, max_bytes: int, fresh_ttl: float, stale_ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.conn: Optional[sqlite3.Connection] = None
+        self.bytes = 0
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self._accessed: Dict[str, float] = {}  # {key: access time} not yet written
+        self._flushed_at = time.time()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.revalidated = 0  # 304 Not Modified
+        self.misses = 0
+        self.offline_hits = 0
+        self.evictions = 0
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    async def close(self):
+        """Stop background revalidation, then write pending access times and close"""
+        tasks = list(self._revalidating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.conn:
+            self.flush_access_times()
+            self.conn.close()
+            self.conn = None
+
+    def flush_access_times(self):
+        """Write the access times collected since the last flush"""
+        if self._accessed:
+            self.conn.executemany(
+                'UPDATE responses SET accessed_at = ? WHERE key = ?',
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self.conn.commit()
+            self._accessed.clear()
+        self._flushed_at = time.time()
+
+    def get(self, key: str) -> Optional[CachedEntry]:
+        row = self.conn.execute(
+            'SELECT status, headers, body, stored_at, max_age FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if not row:
+            return None
+
+        now = time.time()
+        self._accessed[key] = now
+        if len(self._accessed) >= ACCESS_FLUSH_SIZE or now - self._flushed_at >= ACCESS_FLUSH_INTERVAL:
+            self.flush_access_times()
+        status, headers, body, stored_at, max_age = row
+        return CachedEntry(status, json.loads(headers), zlib.decompress(body), stored_at, max_age)
+
+    def put(self, key: str, response: Response):
+        if self.conn is None:  # Closed while a revalidation was finishing
+            return
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        body = zlib.compress(response.body)
+        size = len(body) + len(key)
+        now = time.time()
+
+        self._accessed.pop(key, None)
+        old = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        if old:
+            self.bytes -= old[0]
+        self.conn.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, response.status, json.dumps(headers), body, now, self._max_age(response), now, size)
+        )
+        self.bytes += size
+        self._evict()
+        self.conn.commit()
+
+    def touch(self, key: str, response: Response):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        if self.conn is None:
+            return
+        self._accessed.pop(key, None)
+        now = time.time()
+        self.conn.execute(
+            'UPDATE responses SET stored_at = ?, accessed_at = ?, max_age = ? WHERE key = ?',
+            (now, now, self._max_age(response), key)
+        )
+        self.conn.commit()
+
+    def _max_age(self, response: Response) -> float:
+        match = MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        return float(match.group(1)) if match else self.fresh_ttl
+
+    def _evict(self):
+        if self.bytes > self.max_bytes:
+            self.flush_access_times()  # Evict by up-to-date recency
+        while self.bytes > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed_at LIMIT 50'
+            ).fetchall()
+            if not rows:
+                break
+            self.conn.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key, _ in rows])
+            self.bytes -= sum(size for _, size in rows)
+            self.evictions += len(rows)
+
+    async def fetch(self, scheduler, url: str, *, priority: int = INTERACTIVE,
+                    params: Optional[dict] = None, **kwargs) -> Response:
+        """GET through the cache"""
+        key = cache_key(url, params)
+        entry = self.get(key)
+
+        if entry and entry.age < entry.max_age:
+            self.hits += 1
+            return entry.response('HIT')
+
+        if entry and entry.age < entry.max_age + self.stale_ttl:
+            self.stale_hits += 1
+            if key not in self._revalidating:
+                task = asyncio.create_task(self._fetch(scheduler, key, url, entry, BACKGROUND, params, kwargs))
+                self._revalidating[key] = task
+                task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+            return entry.response('STALE')
+
+        self.misses += 1
+        return await self._fetch(scheduler, key, url, entry, priority, params, kwargs)
+
+    async def _fetch(self, scheduler, key: str, url: str, entry: Optional[CachedEntry],
+                     priority: int, params: Optional[dict], kwargs: dict) -> Response:
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if 'ETag' in entry.headers:
+                headers['If-None-Match'] = entry.headers['ETag']
+            if 'Last-Modified' in entry.headers:
+                headers['If-Modified-Since'] = entry.headers['Last-Modified']
+
+        try:
+            response = await scheduler.request('GET', url, priority=priority, params=params,
+                                               headers=headers, **kwargs)
+        except ScryfallError:
+            if entry:
+                self.offline_hits += 1
+                return entry.response('OFFLINE')
+            raise
+
+        if response.status == 304 and entry:
+            self.revalidated += 1
+            self.touch(key, response)
+            return entry.response('REVALIDATED')
+        if response.status == 200:
+            self.put(key, response)
+        elif response.status >= 500 and entry:
+            self.offline_hits += 1
+            return entry.response('OFFLINE')
+        return response
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        entries = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0] if self.conn else 0
+        return {
+            'entries': entries,
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'offline_hits': self.offline_hits,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,19 @@
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a card name or query for use as a lookup key
+
+    Lowercases, strips accents and apostrophes, and collapses punctuation
+    and whitespace so "Lim-Dûl's Vault" and "lim dul's  vault" share a key.
+    """
+    if not name:
+        return ''
+
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    name = name.lower().replace("'", '').replace('’', '')
+    return _NON_ALNUM.sub(' ', name).strip()
@@ -0,0 +1,221 @@
+"""Positional inverted index over oracle text with BM25 ranking
+
+On-disk layout (little-endian):
+    uint64      header length
+    header      JSON: doc ids, average doc length, vocab {term: [offset, df, width]}
+    lengths     uint16 token count per doc
+    postings    per term: doc id deltas (uint8/16/32, narrowest that fits),
+                uint16 term frequencies, uint16 positions for each doc in order
+
+Postings are read straight out of a memory-mapped file with np.frombuffer,
+so opening the index only parses the header.
+"""
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+TOKEN = re.compile(r'[a-z0-9+\-/]+')
+PHRASE = re.compile(r'"([^"]*)"')
+BM25_K1 = 1.2
+BM25_B = 0.75
+WIDTHS = ((0xFF, np.uint8), (0xFFFF, np.uint16), (0xFFFFFFFF, np.uint32))
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower().replace("'", '').replace('’', ''))
+
+
+def card_text(card: dict) -> str:
+    """Oracle text of a card, joining the faces of multi-faced cards"""
+    if card.get('oracle_text'):
+        return card['oracle_text']
+    return '\n'.join(face.get('oracle_text', '') for face in card.get('card_faces') or [])
+
+
+def build_oracle_index(cards: Iterable[dict], path: str) -> int:
+    """Build an oracle text index file from cards. Returns the number of cards indexed."""
+    ids = []
+    lengths = array('H')
+    postings = {}  # {term: (doc ids, term frequencies, positions)}
+
+    for doc, card in enumerate(cards):
+        ids.append(card['id'])
+        tokens = tokenize(card_text(card))
+        lengths.append(min(len(tokens), 0xFFFF))
+
+        positions = {}
+        for position, token in enumerate(tokens[:0xFFFF]):
+            positions.setdefault(token, []).append(position)
+        for token, token_positions in positions.items():
+            entry = postings.get(token)
+            if entry is None:
+                entry = postings[token] = (array('I'), array('H'), array('H'))
+            entry[0].append(doc)
+            entry[1].append(len(token_positions))
+            entry[2].extend(token_positions)
+
+    blobs = []
+    vocab = {}
+    offset = 0
+    for term, (docs, tfs, positions) in postings.items():
+        deltas = np.diff(np.frombuffer(docs, dtype=np.uint32), prepend=np.uint32(0))
+        width = next(dtype for limit, dtype in WIDTHS if deltas.max() <= limit)
+        blob = deltas.astype(width).tobytes() + tfs.tobytes() + positions.tobytes()
+        vocab[term] = [offset, len(docs), np.dtype(width).itemsize]
+        blobs.append(blob)
+        offset += len(blob)
+
+    avgdl = (sum(lengths) / len(lengths)) if lengths else 0.0
+    header = json.dumps({'ids': ids, 'avgdl': avgdl, 'vocab': vocab}, separators=(',', ':')).encode()
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(lengths.tobytes())
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class OracleIndex:
+    """Memory-mapped oracle text index supporting ranked and phrase queries
+
+    Unquoted words are ranked with BM25, and cards containing the whole query
+    as a phrase are ranked first. Quoted phrases must appear exactly.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids: List[str] = []
+        self.vocab = {}
+        self.avgdl = 0.0
+        self.lengths = np.zeros(0, dtype=np.uint16)
+        self._file = None
+        self._mmap = None
+        self._postings_start = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def open(self) -> bool:
+        self.close()
+        if not os.path.exists(self.path):
+            return False
+
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            header_length = struct.unpack_from('<Q', self._mmap, 0)[0]
+            header = json.loads(self._mmap[8:8 + header_length])
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error opening oracle index: {e}")
+            self.close()
+            return False
+
+        self.ids = header['ids']
+        self.vocab = header['vocab']
+        self.avgdl = header['avgdl']
+        lengths_start = 8 + header_length
+        self.lengths = np.frombuffer(self._mmap, dtype=np.uint16, count=len(self.ids), offset=lengths_start)
+        self._postings_start = lengths_start + 2 * len(self.ids)
+        return True
+
+    def close(self):
+        self.ids = []
+        self.vocab = {}
+        self.lengths = np.zeros(0, dtype=np.uint16)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # Arrays still reference the old map; it's freed with them
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def swap(self, new_path: str) -> bool:
+        self.close()
+        os.replace(new_path, self.path)
+        return self.open()
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return (doc ids, term frequencies, position offsets, positions) for a term"""
+        entry = self.vocab.get(term)
+        if entry is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, empty
+
+        offset, df, width = entry
+        start = self._postings_start + offset
+        dtype = {1: np.uint8, 2: np.uint16, 4: np.uint32}[width]
+        docs = np.cumsum(np.frombuffer(self._mmap, dtype=dtype, count=df, offset=start), dtype=np.int64)
+        start += df * width
+        tfs = np.frombuffer(self._mmap, dtype=np.uint16, count=df, offset=start)
+        start += df * 2
+        positions = np.frombuffer(self._mmap, dtype=np.uint16, count=int(tfs.sum()), offset=start)
+        offsets = np.concatenate(([0], np.cumsum(tfs, dtype=np.int64)))
+        return docs, tfs, offsets, positions
+
+    def phrase_docs(self, terms: List[str]) -> np.ndarray:
+        """Return the docs containing terms as a consecutive phrase
+
+        Every occurrence is keyed as doc * 2^16 + position - offset in phrase,
+        so a phrase match is a key shared by all terms.
+        """
+        starts = None
+        for i, term in enumerate(terms):
+            docs, tfs, _, positions = self.postings(term)
+            keys = np.repeat(docs, tfs) * 0x10000 + positions.astype(np.int64) - i
+            starts = keys if starts is None else np.intersect1d(starts, keys, assume_unique=True)
+            if len(starts) == 0:
+                break
+
+        if starts is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(starts // 0x10000)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to limit (card id, score) pairs, best first"""
+        if not self.ids:
+            return []
+
+        phrases = [tokenize(phrase) for phrase in PHRASE.findall(query)]
+        terms = tokenize(PHRASE.sub(' ', query)) + [term for phrase in phrases for term in phrase]
+        if not terms:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        doc_count = len(self.ids)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths.astype(np.float32) / (self.avgdl or 1))
+        for term in set(terms):
+            docs, tfs, _, _ = self.postings(term)
+            if not len(docs):
+                continue
+            idf = np.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            tf = tfs.astype(np.float32)
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + norm[docs])
+
+        candidates = scores > 0
+        for phrase in phrases:
+            required = np.zeros(doc_count, dtype=bool)
+            required[self.phrase_docs(phrase)] = True
+            candidates &= required
+
+        if not phrases and len(terms) > 1:
+            # Cards containing the whole query as a phrase rank above partial matches
+            scores[self.phrase_docs(terms)] += scores.max()
+
+        rows = np.flatnonzero(candidates)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit)[:limit]]
+        rows = rows[np.argsort(-scores[rows], kind='stable')]
+        return [(self.ids[row], float(scores[row])) for row in rows]
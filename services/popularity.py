@@ -0,0 +1,133 @@
+"""Which cards get looked up most, in bounded memory
+
+A count-min sketch estimates how often every card has been looked up
+(overestimating only on hash collisions, never underestimating), and a
+top-K table keeps the cards with the highest estimates. Counts are halved
+periodically so the ranking follows what people are playing now rather
+than what they looked up months ago.
+"""
+import os
+import time
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class CountMinSketch:
+    """Approximate counts of strings in a fixed depth x width table"""
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width), dtype=np.uint32)
+        self._rows = np.arange(depth)
+
+    def _columns(self, item: str) -> np.ndarray:
+        digest = blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(first + i * second) % self.width for i in range(self.depth)])
+
+    def add(self, item: str, count: int = 1) -> int:
+        """Count an item and return its new estimate"""
+        columns = self._columns(item)
+        self.counts[self._rows, columns] += count
+        return int(self.counts[self._rows, columns].min())
+
+    def estimate(self, item: str) -> int:
+        return int(self.counts[self._rows, self._columns(item)].min())
+
+    def decay(self):
+        self.counts >>= 1
+
+
+class PopularityTracker:
+    """Count-min sketch of lookups plus the K most looked-up cards"""
+
+    def __init__(self, path: str, top_size: int = 300, width: int = 4096, depth: int = 4):
+        self.path = path
+        self.top_size = top_size
+        self.sketch = CountMinSketch(width, depth)
+        self.top: Dict[str, Tuple[int, str]] = {}  # {normalized name: (estimate, display name)}
+        self._floor = 0  # Lowest estimate in a full top table
+        self.decayed_at = time.time()
+        self.lookups = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.top)
+
+    def add(self, key: str, name: str):
+        """Count one lookup of a card"""
+        estimate = self.sketch.add(key)
+        self.lookups += 1
+        self.dirty = True
+
+        if key in self.top or len(self.top) < self.top_size:
+            self.top[key] = (estimate, name)
+        elif estimate > self._floor:
+            # Replace the least looked-up card in the table
+            del self.top[min(self.top, key=lambda k: self.top[k][0])]
+            self.top[key] = (estimate, name)
+        else:
+            return
+        if len(self.top) >= self.top_size:
+            self._floor = min(count for count, _ in self.top.values())
+
+    def most_common(self, count: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """(normalized name, display name, estimate) of the most looked-up cards, most first"""
+        ranked = sorted(self.top.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, name, estimate) for key, (estimate, name) in ranked[:count]]
+
+    def decay(self):
+        """Halve every count so older lookups gradually stop counting"""
+        self.sketch.decay()
+        self.top = {key: (estimate >> 1, name) for key, (estimate, name) in self.top.items() if estimate > 1}
+        self._floor >>= 1
+        self.decayed_at = time.time()
+        self.dirty = True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        ranked = self.most_common()
+        tmp_path = f'{self.path}.tmp.npz'
+        np.savez(
+            tmp_path,
+            counts=self.sketch.counts,
+            keys=np.array([key for key, _, _ in ranked], dtype=str),
+            names=np.array([name for _, name, _ in ranked], dtype=str),
+            estimates=np.array([estimate for _, _, estimate in ranked], dtype=np.uint32),
+            decayed_at=np.array(self.decayed_at),
+            lookups=np.array(self.lookups, dtype=np.int64),
+        )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def load(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+
+        try:
+            with np.load(self.path) as saved:
+                counts = saved['counts']
+                keys = saved['keys'].tolist()
+                names = saved['names'].tolist()
+                estimates = saved['estimates'].tolist()
+                decayed_at = float(saved['decayed_at'])
+                lookups = int(saved['lookups'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading card popularity: {e}")
+            return 0
+
+        if counts.shape != self.sketch.counts.shape:
+            print("Card popularity sketch size changed; starting over")
+            return 0
+
+        self.sketch.counts = counts.astype(np.uint32)
+        ranked = list(zip(keys, names, estimates))[:self.top_size]
+        self.top = {key: (estimate, name) for key, name, estimate in ranked}
+        self._floor = min(estimates[:self.top_size]) if len(self.top) >= self.top_size else 0
+        self.decayed_at = decayed_at
+        self.lookups = lookups
+        return len(self.top)
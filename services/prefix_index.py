@@ -0,0 +1,74 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from .names import normalize_name
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over card names for autocomplete
+
+    Each name is indexed by its full normalized form and by every word
+    suffix, so "sol r" and "ring" both complete to "Sol Ring". Lookups are a
+    bisect plus a short scan, with no network calls.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []  # card names, by name id
+        self.keys: List[str] = []  # sorted normalized keys
+        self.name_ids = array('I')  # name id for each key
+        self.word_start = array('b')  # 0 if the key is the whole name, 1 if a later word
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(cls, names: Iterable[Tuple[str, str]], max_length: Optional[int] = None) -> 'PrefixIndex':
+        """Build an index from (name to match, card name) pairs
+
+        Card names longer than max_length are left out, for callers (Discord
+        autocomplete) that can't return them.
+        """
+        index = cls()
+        ids = {}
+        entries = []
+        for name, target in names:
+            key = normalize_name(name)
+            if not key or (max_length and len(target) > max_length):
+                continue
+            name_id = ids.get(target)
+            if name_id is None:
+                name_id = ids[target] = len(index.names)
+                index.names.append(target)
+
+            entries.append((key, name_id, 0))
+            start = key.find(' ')
+            while start != -1:
+                entries.append((key[start + 1:], name_id, 1))
+                start = key.find(' ', start + 1)
+
+        entries.sort()
+        index.keys = [key for key, _, _ in entries]
+        index.name_ids = array('I', (name_id for _, name_id, _ in entries))
+        index.word_start = array('b', (word for _, _, word in entries))
+        return index
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Return up to limit card names starting with prefix, whole-name matches first"""
+        key = normalize_name(prefix)
+        if not key:
+            return []
+
+        whole, words = [], []
+        seen = set()
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position].startswith(key):
+            name_id = self.name_ids[position]
+            if name_id not in seen:
+                seen.add(name_id)
+                (words if self.word_start[position] else whole).append(self.names[name_id])
+                if len(whole) >= limit or len(seen) >= limit * 4:
+                    break
+            position += 1
+
+        return (whole + words)[:limit]
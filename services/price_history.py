@@ -0,0 +1,278 @@
+"""Daily price history in a memory-mapped time-series array, plus price watchlists
+
+On-disk layout:
+    <path>          float32 array of shape (days, stride, 3): usd, usd_foil, eur
+                    per card column per day, NaN where there was no price
+    <path>.json     {"keys": [card key per column], "dates": ["YYYY-MM-DD", ...], "stride": n}
+
+Days are stored one after another, so recording a day appends one row to the
+file. stride leaves room for new cards; the file is only rewritten when the
+card count outgrows it or old days are trimmed. Cards are keyed by oracle id,
+which stays the same when Scryfall picks a different printing for a card.
+"""
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+FIELDS = ('usd', 'usd_foil', 'eur')
+USD, USD_FOIL, EUR = range(len(FIELDS))
+ROW_SLACK = 1.25  # Spare card columns per row, so new sets don't force a rewrite
+TRIM_SLACK = 30  # Trim old days in batches rather than rewriting the file daily
+SPARK = '▁▂▃▄▅▆▇█'
+
+
+def card_key(card: dict) -> Optional[str]:
+    return card.get('oracle_id') or card.get('id')
+
+
+def _price(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def price_snapshot(cards: Iterable[dict]) -> Iterator[Tuple[str, Tuple[float, float, float]]]:
+    """(card key, (usd, usd_foil, eur)) for every card with a price"""
+    for card in cards:
+        key = card_key(card)
+        prices = card.get('prices') or {}
+        if key and any(prices.get(field) for field in FIELDS):
+            yield key, tuple(_price(prices.get(field)) for field in FIELDS)
+
+
+def _read_meta(path: str) -> dict:
+    try:
+        with open(f'{path}.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'keys': [], 'dates': [], 'stride': 0}
+
+
+def _write_meta(path: str, meta: dict):
+    tmp_path = f'{path}.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, separators=(',', ':'))
+    os.replace(tmp_path, f'{path}.json')
+
+
+def append_snapshot(path: str, date: str, snapshot: Iterable[Tuple[str, tuple]], max_days: int) -> int:
+    """Record one day of prices. Returns the number of days stored.
+
+    Recording the same date again replaces that day. Blocking; run it in a thread.
+    """
+    meta = _read_meta(path)
+    keys, dates, stride = meta['keys'], meta['dates'], meta['stride']
+    if dates and date < dates[-1]:
+        return len(dates)
+
+    columns = {key: column for column, key in enumerate(keys)}
+    day_columns, day_prices = [], []
+    for key, prices in snapshot:
+        column = columns.get(key)
+        if column is None:
+            column = columns[key] = len(keys)
+            keys.append(key)
+        day_columns.append(column)
+        day_prices.append(prices)
+
+    old_days = len(dates)
+    if not dates or dates[-1] != date:
+        dates.append(date)
+    day = len(dates) - 1
+
+    drop = len(dates) - max_days if len(dates) > max_days + TRIM_SLACK else 0
+    if len(keys) > stride or drop:
+        # Rewrite with room for more cards and without the oldest days
+        new_stride = max(stride, int(len(keys) * ROW_SLACK))
+        kept = max(old_days - drop, 0)
+        data = np.full((kept, new_stride, len(FIELDS)), np.nan, dtype=np.float32)
+        if kept and os.path.exists(path):
+            old = np.memmap(path, dtype=np.float32, mode='r', shape=(old_days, stride, len(FIELDS)))
+            data[:, :stride] = old[drop:old_days]
+            del old
+        new_path = f'{path}.new'
+        data.tofile(new_path)
+        os.replace(new_path, path)
+        del dates[:drop]
+        day -= drop
+        stride = meta['stride'] = new_stride
+
+    row = np.full((stride, len(FIELDS)), np.nan, dtype=np.float32)
+    if day_columns:
+        row[np.array(day_columns)] = np.array(day_prices, dtype=np.float32)
+
+    row_bytes = row.nbytes
+    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+        f.seek(day * row_bytes)
+        f.write(row.tobytes())
+        f.truncate((day + 1) * row_bytes)
+
+    _write_meta(path, meta)
+    return len(dates)
+
+
+def sparkline(values: np.ndarray) -> str:
+    """Render a series as block characters, skipping missing days"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return ''
+    low, high = values.min(), values.max()
+    if high == low:
+        return SPARK[len(SPARK) // 2] * len(values)
+    steps = ((values - low) / (high - low) * (len(SPARK) - 1)).round().astype(int)
+    return ''.join(SPARK[step] for step in steps)
+
+
+def summarize(history: np.ndarray, periods: Iterable[int] = (1, 7, 30)) -> dict:
+    """Latest prices, USD trend over each period and for all history, range and a sparkline"""
+    latest = {}
+    for i, field in enumerate(FIELDS):
+        known = history[:, i][~np.isnan(history[:, i])]
+        if len(known):
+            latest[field] = float(known[-1])
+
+    usd = history[:, USD]
+    periods = [days for days in periods if days < len(usd)]
+    if len(usd) - 1 not in periods:
+        periods.append(len(usd) - 1)  # All time
+    changes = {}
+    for days in periods:
+        window = usd[-(days + 1):]
+        window = window[~np.isnan(window)]
+        if days > 0 and len(window) >= 2 and window[0]:
+            changes[days] = (float(window[0]), float(window[-1]), float((window[-1] - window[0]) / window[0] * 100))
+
+    known = usd[~np.isnan(usd)]
+    return {
+        'latest': latest,
+        'changes': changes,
+        'low': float(known.min()) if len(known) else None,
+        'high': float(known.max()) if len(known) else None,
+        'spark': sparkline(usd[-30:]),
+    }
+
+
+class PriceHistory:
+    """Read-only, memory-mapped view of the recorded price history"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keys: List[str] = []
+        self.columns: Dict[str, int] = {}
+        self.dates: List[str] = []
+        self.prices = np.zeros((0, 0, len(FIELDS)), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def open(self) -> bool:
+        self.close()
+        meta = _read_meta(self.path)
+        if not meta['dates'] or not os.path.exists(self.path):
+            return False
+
+        try:
+            self.prices = np.memmap(
+                self.path, dtype=np.float32, mode='r', shape=(len(meta['dates']), meta['stride'], len(FIELDS))
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error opening price history: {e}")
+            return False
+
+        self.keys = meta['keys']
+        self.columns = {key: column for column, key in enumerate(self.keys)}
+        self.dates = meta['dates']
+        return True
+
+    def close(self):
+        self.keys = []
+        self.columns = {}
+        self.dates = []
+        self.prices = np.zeros((0, 0, len(FIELDS)), dtype=np.float32)
+
+    def history(self, card: dict) -> Optional[np.ndarray]:
+        """(days, 3) prices of one card, oldest first, or None if it was never recorded"""
+        column = self.columns.get(card_key(card))
+        if column is None:
+            return None
+        return np.array(self.prices[:, column])
+
+    def change(self, field: int = USD) -> Tuple[np.ndarray, np.ndarray]:
+        """(previous, latest) prices of every card column for the last two recorded days"""
+        if len(self.dates) < 2:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty
+        return np.array(self.prices[-2, :, field]), np.array(self.prices[-1, :, field])
+
+
+class Watchlist:
+    """Per-user card price watches, checked against each new day of price history"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: List[dict] = []  # {user_id, channel_id, key, name, threshold}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def for_user(self, user_id: int) -> List[dict]:
+        return [entry for entry in self.entries if entry['user_id'] == user_id]
+
+    def add(self, user_id: int, channel_id: int, card: dict, threshold: float):
+        """Watch a card for a user, replacing any existing watch on it"""
+        self.remove(user_id, card)
+        self.entries.append({
+            'user_id': user_id,
+            'channel_id': channel_id,
+            'key': card_key(card),
+            'name': card.get('name', 'Unknown'),
+            'threshold': threshold,
+        })
+
+    def remove(self, user_id: int, card: dict) -> bool:
+        key = card_key(card)
+        before = len(self.entries)
+        self.entries = [
+            entry for entry in self.entries if not (entry['user_id'] == user_id and entry['key'] == key)
+        ]
+        return len(self.entries) != before
+
+    def check(self, history: PriceHistory) -> List[Tuple[dict, float, float, float]]:
+        """(entry, old price, new price, percent change) for watches whose threshold was crossed"""
+        previous, latest = history.change(USD)
+        if not len(latest) or not self.entries:
+            return []
+
+        columns = np.array([history.columns.get(entry['key'], -1) for entry in self.entries])
+        thresholds = np.array([entry['threshold'] for entry in self.entries], dtype=np.float32)
+        known = columns >= 0
+        old = np.where(known, previous[columns], np.nan)
+        new = np.where(known, latest[columns], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = (new - old) / old * 100
+        fired = np.flatnonzero(np.abs(percent) >= thresholds)  # NaN compares False
+
+        return [
+            (self.entries[i], float(old[i]), float(new[i]), float(percent[i])) for i in fired
+        ]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading price watchlist: {e}")
+        return len(self.entries)
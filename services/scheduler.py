@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+from typing import Dict, Optional
+
+import aiohttp
+
+# Request priorities (lower is served first)
+INTERACTIVE = 0  # A user is waiting on the answer
+BACKGROUND = 1  # Warmers, refreshes and other jobs
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ScryfallError(Exception):
+    """Raised when Scryfall can't be reached after retrying"""
+
+
+class Response:
+    """A fully read HTTP response"""
+
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int, headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class RequestScheduler:
+    """Central outbound scheduler for Scryfall API requests
+
+    A token bucket keeps the bot under Scryfall's requested rate, waiting
+    requests are served interactive-first, and failed requests are retried
+    with jittered exponential backoff that honors Retry-After. A 429 pauses
+    the whole bucket, not just the request that got it.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, rate: float = 10, burst: int = 10,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30,
+                 cache=None):
+        self.session = session
+        self.cache = cache  # Optional HttpCache for GET requests
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0  # 429 responses
+        self.failures = 0  # Requests that failed after all retries
+        self.wait_count = [0, 0]  # per priority
+        self.wait_total = [0.0, 0.0]
+        self.wait_max = [0.0, 0.0]
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = INTERACTIVE):
+        """Wait for a request slot"""
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await future
+
+        waited = time.monotonic() - started
+        self.wait_count[priority] += 1
+        self.wait_total[priority] += waited
+        self.wait_max[priority] = max(self.wait_max[priority], waited)
+
+    async def _dispatch(self):
+        while self._waiters:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # Caller was cancelled while queued
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    async def request(self, method: str, url: str, *, priority: int = INTERACTIVE, **kwargs) -> Response:
+        """Send a request through the scheduler
+
+        Returns the final response, which may still be an error status once
+        retries are exhausted. Raises ScryfallError if Scryfall is unreachable.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(priority)
+            self.requests += 1
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    result = Response(response.status, response.headers, await response.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    raise ScryfallError(f'{method} {url} failed: {e}') from e
+                delay = self._backoff(attempt)
+            else:
+                if result.status not in RETRY_STATUSES:
+                    return result
+                if result.status == 429:
+                    self.throttled += 1
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    return result
+                delay = self._backoff(attempt, result.headers.get('Retry-After'))
+                if result.status == 429:
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, *, priority: int = INTERACTIVE, cache: bool = True, **kwargs) -> Response:
+        """Send a GET request, through the response cache if there is one"""
+        if cache and self.cache:
+            return await self.cache.fetch(self, url, priority=priority, **kwargs)
+        return await self.request('GET', url, priority=priority, **kwargs)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        def average(priority):
+            count = self.wait_count[priority]
+            return self.wait_total[priority] / count if count else 0.0
+
+        return {
+            'queue_depth': self.queue_depth,
+            'requests': self.requests,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'failures': self.failures,
+            'interactive_wait_avg': average(INTERACTIVE),
+            'interactive_wait_max': self.wait_max[INTERACTIVE],
+            'background_wait_avg': average(BACKGROUND),
+            'background_wait_max': self.wait_max[BACKGROUND],
+        }
@@ -0,0 +1,175 @@
+"""Functionally similar cards via TF-IDF nearest neighbors
+
+Each card is a sparse TF-IDF vector over its oracle text (words and word
+pairs, with the card's own name replaced) and type line. Rows are L2
+normalized at build time, so cosine similarity against every card is one
+sparse matrix-vector product followed by a top-k partial sort.
+"""
+import math
+import os
+import re
+from array import array
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .oracle_index import card_text, tokenize
+
+MIN_DF = 2  # Terms on only one card can't make two cards similar
+
+
+def card_terms(card: dict) -> Counter:
+    """Count the terms describing what a card does"""
+    text = card_text(card)
+    for name in card.get('name', '').split(' // '):
+        if name:
+            text = re.sub(re.escape(name), 'cardname', text, flags=re.IGNORECASE)
+
+    words = tokenize(text)
+    terms = Counter(words)
+    terms.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    terms.update(f't:{word}' for word in tokenize(card.get('type_line', '').replace('—', ' ')))
+    return terms
+
+
+def build_similarity_index(cards: Callable[[], Iterable[dict]], path: str) -> int:
+    """Build the normalized TF-IDF matrix for cards and save it. Returns the card count.
+
+    cards is called twice for two streaming passes, the first counting
+    document frequencies and the second writing matrix rows, so only one
+    card's terms are held at a time.
+    """
+    doc_count = 0
+    df = Counter()
+    for card in cards():
+        df.update(card_terms(card).keys())
+        doc_count += 1
+
+    vocab = {term: i for i, term in enumerate(term for term, count in df.items() if count >= MIN_DF)}
+    idf = np.zeros(len(vocab), dtype=np.float32)
+    for term, column in vocab.items():
+        idf[column] = math.log(doc_count / df[term])
+    del df
+
+    ids, names = [], []
+    indptr = array('q', [0])
+    indices, data = array('i'), array('f')
+    for card in cards():
+        terms = card_terms(card)
+        ids.append(card['id'])
+        names.append(card['name'])
+        columns = [vocab[term] for term in terms if term in vocab]
+        weights = np.array([1 + math.log(terms[term]) for term in terms if term in vocab], dtype=np.float32)
+        weights *= idf[columns] if columns else 1
+        norm = np.linalg.norm(weights)
+        if norm:
+            weights /= norm
+        indices.extend(columns)
+        data.extend(weights.tolist())
+        indptr.append(len(indices))
+
+    tmp_path = f'{path}.tmp.npz'
+    np.savez(
+        tmp_path,
+        ids=np.array(ids),
+        names=np.array(names),
+        terms=np.array(list(vocab)),
+        idf=idf,
+        indptr=np.frombuffer(indptr, dtype=np.int64),
+        indices=np.frombuffer(indices, dtype=np.int32),
+        data=np.frombuffer(data, dtype=np.float32),
+    )
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class SimilarityIndex:
+    """Nearest-neighbor lookups over the saved TF-IDF matrix"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.vocab: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float32)
+        self.nnz_rows = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def open(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with np.load(self.path) as saved:
+                self.ids = saved['ids'].tolist()
+                self.names = saved['names'].tolist()
+                self.vocab = {term: i for i, term in enumerate(saved['terms'].tolist())}
+                self.idf = saved['idf']
+                self.indptr = saved['indptr']
+                self.indices = saved['indices']
+                self.data = saved['data']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error opening similarity index: {e}")
+            return False
+
+        self.rows = {card_id: row for row, card_id in enumerate(self.ids)}
+        # Row number of every stored value, for the matrix-vector product
+        self.nnz_rows = np.repeat(
+            np.arange(len(self.ids), dtype=np.int32), np.diff(self.indptr)
+        )
+        return True
+
+    def swap(self, new_path: str) -> bool:
+        os.replace(new_path, self.path)
+        return self.open()
+
+    def vector(self, card: dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (columns, weights) of a card's normalized TF-IDF vector"""
+        row = self.rows.get(card.get('id'))
+        if row is not None:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            return self.indices[start:end], self.data[start:end]
+
+        # Cards newer than the index are vectorized against its vocabulary
+        terms = card_terms(card)
+        columns = np.array([self.vocab[term] for term in terms if term in self.vocab], dtype=np.int32)
+        weights = np.array(
+            [1 + math.log(terms[term]) for term in terms if term in self.vocab], dtype=np.float32
+        ) * self.idf[columns]
+        norm = np.linalg.norm(weights)
+        return columns, (weights / norm if norm else weights)
+
+    def most_similar(self, card: dict, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to limit (card id, cosine similarity) pairs, most similar first"""
+        columns, weights = self.vector(card)
+        if not len(self.ids) or not len(columns):
+            return []
+
+        query = np.zeros(len(self.vocab), dtype=np.float32)
+        query[columns] = weights
+        scores = np.bincount(
+            self.nnz_rows, weights=self.data * query[self.indices], minlength=len(self.ids)
+        )
+
+        # Over-fetch so skipping the card itself and other printings still fills the list
+        count = min(len(scores), limit * 4 + 1)
+        top = np.argpartition(-scores, count - 1)[:count]
+        top = top[np.argsort(-scores[top])]
+
+        seen = {card.get('name')}
+        results = []
+        for row in top:
+            if scores[row] <= 0 or self.names[row] in seen:
+                continue
+            seen.add(self.names[row])
+            results.append((self.ids[row], float(scores[row])))
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,125 @@
+"""Mana and card symbol rendering from Scryfall's symbology table
+
+Every known symbol is rendered once up front: to a guild emoji when one is
+named after it (e.g. {W/U} -> :mana_wu:), otherwise to readable text such
+as (W/U) for hybrid or (G/Φ) for Phyrexian mana. Rendering a cost or rules
+text is then one regex pass with dictionary lookups, and rendered costs are
+memoized since the same few thousand cost strings repeat endlessly.
+"""
+import json
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from .scheduler import BACKGROUND, RequestScheduler, ScryfallError
+
+SYMBOL = re.compile(r'\{[^{}]+\}')
+EMOJI_NAME_CHARS = re.compile(r'[^a-z0-9_]')
+COST_CACHE_SIZE = 4096
+TEXT_NAMES = {'{T}': 'Tap', '{Q}': 'Untap', '{E}': 'Energy', '{CHAOS}': 'Chaos', '{PW}': 'PW'}
+
+
+def emoji_name(symbol: str, prefix: str) -> str:
+    """Guild emoji name for a symbol: {W/U} -> mana_wu, {2/W} -> mana_2w, {T} -> mana_t"""
+    return prefix + EMOJI_NAME_CHARS.sub('', symbol.lower())
+
+
+def symbol_text(symbol: str) -> str:
+    """Readable plain text for a symbol without an emoji"""
+    if symbol in TEXT_NAMES:
+        return TEXT_NAMES[symbol]
+    body = symbol[1:-1]
+    if '/' not in body:
+        return body
+    return '(' + '/'.join('Φ' if part == 'P' else part for part in body.split('/')) + ')'
+
+
+async def load_symbology(scheduler: RequestScheduler, api_base: str, path: str, max_age: float) -> list:
+    """Scryfall's symbol table, from disk unless it is older than max_age
+
+    Falls back to the copy on disk, however old, if Scryfall can't be reached.
+    """
+    cached = None
+    if os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading symbology: {e}")
+        else:
+            if time.time() - os.path.getmtime(path) < max_age:
+                return cached
+
+    try:
+        response = await scheduler.get(f'{api_base}/symbology', priority=BACKGROUND, cache=False)
+    except ScryfallError as e:
+        print(f"Error fetching symbology: {e}")
+        return cached or []
+    if response.status != 200:
+        print(f"Error fetching symbology: HTTP {response.status}")
+        return cached or []
+
+    symbology = response.json().get('data', [])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(symbology, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return symbology
+
+
+class ManaSymbols:
+    """Renders mana costs and rules text with guild emoji where available"""
+
+    def __init__(self):
+        self.emoji: Dict[str, str] = {}  # {symbol: emoji markup}
+        self.text: Dict[str, str] = {}  # {symbol: plain text}
+        self.render_cost = lru_cache(maxsize=COST_CACHE_SIZE)(self._render_cost)
+
+    def build(self, symbology: Iterable[dict], emojis: Dict[str, str], prefix: str = 'mana_'):
+        """Precompute how every symbol renders, given {emoji name: emoji markup}"""
+        symbols = {entry['symbol'] for entry in symbology if entry.get('symbol')}
+        self.text = {symbol: symbol_text(symbol) for symbol in symbols}
+        self.emoji = {}
+        for symbol in symbols:
+            emoji = emojis.get(emoji_name(symbol, prefix))
+            if emoji:
+                self.emoji[symbol] = emoji
+        self.render_cost.cache_clear()
+
+    def symbol(self, symbol: str) -> str:
+        return self.emoji.get(symbol) or self.text.get(symbol) or symbol_text(symbol)
+
+    def _render_cost(self, cost: str) -> str:
+        parts = []
+        previous_text = False
+        position = 0
+        for match in SYMBOL.finditer(cost):
+            if match.start() > position:
+                parts.append(cost[position:match.start()])  # e.g. " // " between split card halves
+                previous_text = False
+            emoji = self.emoji.get(match.group())
+            if emoji:
+                parts.append(emoji)
+            else:
+                parts.append((' ' if previous_text else '') + self.symbol(match.group()))
+            previous_text = not emoji
+            position = match.end()
+        parts.append(cost[position:])
+        return ''.join(parts)
+
+    def render_text(self, text: str, limit: Optional[int] = None) -> str:
+        """Replace symbols in rules text with emoji, leaving symbols without one as written
+
+        With a limit, the result is cut to fit without splitting an emoji.
+        """
+        if self.emoji:
+            text = SYMBOL.sub(lambda match: self.emoji.get(match.group(), match.group()), text)
+        if limit and len(text) > limit:
+            text = text[:limit - 3]
+            if text.rfind('<') > text.rfind('>'):
+                text = text[:text.rfind('<')]
+            text += '...'
+        return text
@@ -0,0 +1,35 @@
+import io
+import json
+
+import pytest
+
+from services.bulk_import import iter_json_array
+
+CARDS = [{'id': str(i), 'name': f'Card {i}', 'oracle_text': 'Draw a card. ' * i} for i in range(20)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_elements_spanning_chunks(chunk_size):
+    text = json.dumps(CARDS, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == CARDS
+
+
+def test_numbers_split_across_chunks():
+    assert list(iter_json_array(io.StringIO('[12345, 678]'), 3)) == [12345, 678]
+
+
+@pytest.mark.parametrize('text', ['[]', '  [ \n ]  ', '[\n]'])
+def test_empty_array(text):
+    assert list(iter_json_array(io.StringIO(text), 2)) == []
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[',
+    '[{"id": "1"}, {"id": "2", "na',
+    '[{"id": "1"}, {"id": "2"}',
+    '[{"id": "1"},',
+])
+def test_truncated_file(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 4))
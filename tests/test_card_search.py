@@ -0,0 +1,20 @@
+import pytest
+
+from services.card_search import CardTable, SearchError
+
+CARDS = [
+    {'id': '1', 'name': 'Sol Ring', 'type_line': 'Artifact', 'colors': [], 'color_identity': [], 'cmc': 1, 'rarity': 'uncommon'},
+    {'id': '2', 'name': 'Llanowar Elves', 'type_line': 'Creature — Elf Druid', 'colors': ['G'], 'color_identity': ['G'], 'cmc': 1, 'rarity': 'common'},
+]
+
+
+@pytest.mark.parametrize('query', ['set:cmr', 'is:commander t:creature', 'f:commander', '-is:reprint', 'usd>5'])
+def test_unsupported_key_raises(query):
+    with pytest.raises(SearchError):
+        CardTable(CARDS).search(query)
+
+
+def test_bare_words_match_names():
+    table = CardTable(CARDS)
+    assert [table.ids[row] for row in table.search('ring')] == ['1']
+    assert [table.ids[row] for row in table.search('-ring')] == ['2']
@@ -0,0 +1,23 @@
+from services.prefix_index import PrefixIndex
+
+LONG_NAME = (
+    'Our Market Research Shows That Players Like Really Long Card Names So We Made This Card '
+    'to Have the Absolute Longest Card Name Ever Elemental'
+)
+
+
+def build(max_length=None):
+    names = [(name, name) for name in ('Sol Ring', 'Ring of Kalonia', 'Market Research', LONG_NAME)]
+    return PrefixIndex.build(names, max_length)
+
+
+def test_completes_whole_names_before_later_words():
+    assert build().complete('ring') == ['Ring of Kalonia', 'Sol Ring']
+
+
+def test_long_names_left_out():
+    index = build(max_length=100)
+    for prefix in ('our', 'market', 'longest', 'elemental'):
+        assert all(len(name) <= 100 for name in index.complete(prefix))
+    assert index.complete('market') == ['Market Research']
+    assert LONG_NAME in build().complete('our')
@@ -0,0 +1,90 @@
+import math
+from datetime import date, timedelta
+
+import numpy as np
+
+from services.price_history import FIELDS, ROW_SLACK, TRIM_SLACK, PriceHistory, Watchlist, append_snapshot
+
+
+def day(*prices):
+    """Snapshot of cards a, b, c... with these USD prices"""
+    return [(chr(ord('a') + i), (usd, math.nan, math.nan)) for i, usd in enumerate(prices)]
+
+
+def opened(path):
+    history = PriceHistory(path)
+    assert history.open()
+    return history
+
+
+def usd(history, key):
+    return history.history({'oracle_id': key})[:, 0].tolist()
+
+
+def test_stride_grows_and_keeps_earlier_days(tmp_path):
+    path = str(tmp_path / 'prices.f32')
+    append_snapshot(path, '2024-01-01', day(1.0), 365)
+    stride = opened(path).prices.shape[1]
+
+    many = day(*range(2, stride + 3))  # More cards than the first stride holds
+    assert append_snapshot(path, '2024-01-02', many, 365) == 2
+
+    history = opened(path)
+    assert history.prices.shape[1] == int(len(many) * ROW_SLACK) > stride
+    assert usd(history, 'a') == [1.0, 2.0]
+    new_card = usd(history, many[-1][0])
+    assert math.isnan(new_card[0]) and new_card[1] == many[-1][1][0]
+
+
+def test_old_days_trimmed_in_batches(tmp_path):
+    path = str(tmp_path / 'prices.f32')
+    max_days = 5
+    for i in range(max_days + TRIM_SLACK):
+        append_snapshot(path, str(date(2024, 1, 1) + timedelta(days=i)), day(float(i)), max_days)
+    assert len(opened(path)) == max_days + TRIM_SLACK  # Within the slack, nothing is dropped yet
+
+    count = append_snapshot(path, '2024-03-01', day(99.0), max_days)
+    history = opened(path)
+    assert count == len(history) == max_days
+    assert usd(history, 'a') == [float(i) for i in range(TRIM_SLACK + 1, max_days + TRIM_SLACK)] + [99.0]
+    assert history.dates[-1] == '2024-03-01'
+    assert history.prices.nbytes == max_days * history.prices.shape[1] * len(FIELDS) * 4
+
+
+def test_same_date_replaces_the_day(tmp_path):
+    path = str(tmp_path / 'prices.f32')
+    append_snapshot(path, '2024-01-01', day(1.0, 2.0), 365)
+    append_snapshot(path, '2024-01-02', day(3.0, 4.0), 365)
+    assert append_snapshot(path, '2024-01-02', day(5.0), 365) == 2
+
+    history = opened(path)
+    assert history.dates == ['2024-01-01', '2024-01-02']
+    assert usd(history, 'a') == [1.0, 5.0]
+    assert usd(history, 'b')[0] == 2.0 and math.isnan(usd(history, 'b')[1])
+
+    # Earlier dates are ignored
+    assert append_snapshot(path, '2023-12-31', day(7.0), 365) == 2
+    assert usd(opened(path), 'a') == [1.0, 5.0]
+
+
+def test_watchlist_check_skips_unknown_cards(tmp_path):
+    path = str(tmp_path / 'prices.f32')
+    append_snapshot(path, '2024-01-01', day(10.0, 10.0), 365)
+    append_snapshot(path, '2024-01-02', day(12.0, 10.5), 365)
+
+    watchlist = Watchlist(str(tmp_path / 'watchlist.json'))
+    watchlist.add(1, 100, {'oracle_id': 'a', 'name': 'A'}, 10.0)
+    watchlist.add(1, 100, {'oracle_id': 'b', 'name': 'B'}, 10.0)
+    watchlist.add(2, 200, {'oracle_id': 'unknown', 'name': 'Unknown'}, 0.0)
+
+    fired = watchlist.check(opened(path))
+    assert [(entry['name'], old, new) for entry, old, new, _ in fired] == [('A', 10.0, 12.0)]
+    assert np.isclose(fired[0][3], 20.0)
+
+
+def test_watchlist_check_needs_two_days(tmp_path):
+    path = str(tmp_path / 'prices.f32')
+    append_snapshot(path, '2024-01-01', day(10.0), 365)
+    watchlist = Watchlist(str(tmp_path / 'watchlist.json'))
+    watchlist.add(1, 100, {'oracle_id': 'a', 'name': 'A'}, 0.0)
+    assert watchlist.check(opened(path)) == []
@@ -0,0 +1,4 @@
+from .paginator import PageSource, Paginator
+from .search import LocalSearchPages, ScryfallSearchPages
+
+__all__ = ['PageSource', 'Paginator', 'LocalSearchPages', 'ScryfallSearchPages']
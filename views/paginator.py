@@ -0,0 +1,140 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import discord
+
+import config
+from services import LRUCache, ScryfallError, SingleFlight
+
+
+class PageSource(ABC):
+    """Produces one page of results at a time
+
+    total is None until the first page has been fetched, for sources that
+    only learn how many results there are from the first response.
+    """
+
+    per_page = config.SEARCH_PAGE_SIZE
+    total: Optional[int] = None
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-(self.total or 0) // self.per_page))
+
+    @abstractmethod
+    async def fetch(self, page: int) -> list:
+        """Items on a page"""
+
+    @abstractmethod
+    def render(self, page: int, items: list) -> discord.Embed:
+        """Embed showing a fetched page"""
+
+
+class Paginator(discord.ui.View):
+    """Button navigation over a PageSource that only loads the pages people look at
+
+    Visited pages are cached for this message with an expiry, and the next
+    page is fetched in the background while the current one is being read.
+    """
+
+    def __init__(self, source: PageSource, author_id: int):
+        super().__init__(timeout=config.SEARCH_VIEW_TIMEOUT)
+        self.source = source
+        self.author_id = author_id
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self.pages = LRUCache(config.SEARCH_PAGE_CACHE_SIZE, config.SEARCH_PAGE_TTL)
+        self.inflight = SingleFlight()
+        self.prefetches = set()  # Background page fetches, kept referenced until done
+
+    async def get_page(self, page: int) -> list:
+        items = self.pages.get(page)
+        if items is None:
+            # A click on a page that is still prefetching waits for that fetch
+            items = await self.inflight.do(page, lambda: self.source.fetch(page))
+            self.pages.set(page, items)
+        return items
+
+    def prefetch(self, page: int):
+        if page >= self.source.page_count or page in self.pages:
+            return
+
+        async def fetch():
+            try:
+                await self.get_page(page)
+            except Exception as e:
+                print(f"Error prefetching page {page + 1}: {e}")
+
+        task = asyncio.create_task(fetch())
+        self.prefetches.add(task)
+        task.add_done_callback(self.prefetches.discard)
+
+    async def start(self, ctx):
+        """Send the first page, with buttons if there is more than one"""
+        items = await self.get_page(0)
+        if self.source.page_count == 1:
+            self.stop()
+            await ctx.send(embed=self.source.render(0, items))
+            return
+
+        self.update_buttons()
+        self.message = await ctx.send(embed=self.source.render(0, items), view=self)
+        self.prefetch(1)
+
+    async def show(self, interaction: discord.Interaction, page: int):
+        self.page = page
+        self.update_buttons()
+        if page in self.pages:
+            await interaction.response.edit_message(embed=self.source.render(page, self.pages.get(page)), view=self)
+        else:
+            await interaction.response.defer()
+            try:
+                items = await self.get_page(page)
+            except ScryfallError:
+                await interaction.followup.send("Scryfall isn't responding right now. Try again in a minute.", ephemeral=True)
+                return
+            await interaction.edit_original_response(embed=self.source.render(page, items), view=self)
+        self.prefetch(page + 1)
+
+    def update_buttons(self):
+        last = self.source.page_count - 1
+        self.first_page.disabled = self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.last_page.disabled = self.page >= last
+        self.page_label.label = f'{self.page + 1}/{last + 1}'
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who searched can turn the pages.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        self.pages.clear()
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(emoji='⏮️', style=discord.ButtonStyle.secondary)
+    async def first_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, 0)
+
+    @discord.ui.button(emoji='◀️', style=discord.ButtonStyle.primary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label='1/1', style=discord.ButtonStyle.secondary, disabled=True)
+    async def page_label(self, interaction: discord.Interaction, button: discord.ui.Button):
+        pass
+
+    @discord.ui.button(emoji='▶️', style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, min(self.page + 1, self.source.page_count - 1))
+
+    @discord.ui.button(emoji='⏭️', style=discord.ButtonStyle.secondary)
+    async def last_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.source.page_count - 1)
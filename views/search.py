@@ -0,0 +1,85 @@
+import discord
+import numpy as np
+
+import config
+from services import RequestScheduler, ScryfallError
+from services.card_search import CardTable, SearchError
+from .paginator import PageSource
+
+
+def search_embed(query: str, total: int, page: int, page_count: int, items: list, source: str) -> discord.Embed:
+    """One page of search results: a line per card"""
+    embed = discord.Embed(
+        title=f"🔎 {total} card{'s' if total != 1 else ''} found",
+        description='\n'.join(f"**{item['name']}** — {item.get('type_line', '')}" for item in items),
+        color=config.COLOR_PRIMARY
+    )
+    embed.set_footer(text=f"Page {page + 1}/{page_count} • {query} • {source}")
+    return embed
+
+
+class LocalSearchPages(PageSource):
+    """Pages of a search over the local card table; rows are only formatted for the page shown"""
+
+    def __init__(self, table: CardTable, rows: np.ndarray, query: str, elapsed: float):
+        self.table = table
+        self.rows = rows
+        self.query = query
+        self.elapsed = elapsed
+        self.total = len(rows)
+
+    async def fetch(self, page: int) -> list:
+        start = page * self.per_page
+        return [self.table.row(row) for row in self.rows[start:start + self.per_page]]
+
+    def render(self, page: int, items: list) -> discord.Embed:
+        return search_embed(self.query, self.total, page, self.page_count, items, f'{self.elapsed:.1f} ms')
+
+
+class ScryfallSearchPages(PageSource):
+    """Pages of a Scryfall /cards/search query, requesting only the result pages a view needs
+
+    Scryfall pages hold SCRYFALL_SEARCH_PAGE_SIZE cards, so one request usually
+    covers several of our pages; responses go through the HTTP cache, so the
+    next of our pages rarely costs another request.
+    """
+
+    def __init__(self, scheduler: RequestScheduler, query: str):
+        self.scheduler = scheduler
+        self.query = query
+
+    async def fetch_results(self, scryfall_page: int) -> list:
+        response = await self.scheduler.get(
+            config.SCRYFALL_SEARCH, params={'q': self.query, 'order': 'name', 'page': str(scryfall_page)}
+        )
+        if response.status == 404:
+            self.total = self.total or 0
+            return []
+        if response.status == 400:
+            raise SearchError(response.json().get('details', 'Scryfall could not understand that query'))
+        if response.status != 200:
+            raise ScryfallError(f'Scryfall returned HTTP {response.status}')
+
+        data = response.json()
+        self.total = data.get('total_cards', 0)
+        return data.get('data', [])
+
+    async def fetch(self, page: int) -> list:
+        start = page * self.per_page
+        end = start + self.per_page
+        size = config.SCRYFALL_SEARCH_PAGE_SIZE
+
+        cards = []
+        for scryfall_page in range(start // size, (end - 1) // size + 1):
+            results = await self.fetch_results(scryfall_page + 1)
+            offset = scryfall_page * size
+            cards.extend(results[max(start - offset, 0):max(end - offset, 0)])
+            if len(results) < size:
+                break
+        return [
+            {'id': card.get('id'), 'name': card.get('name', 'Unknown'), 'type_line': card.get('type_line', '')}
+            for card in cards
+        ]
+
+    def render(self, page: int, items: list) -> discord.Embed:
+        return search_embed(self.query, self.total or 0, page, self.page_count, items, 'Scryfall')